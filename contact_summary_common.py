@@ -0,0 +1,223 @@
+"""
+Shared helpers for the contact summary scripts
+Used by create_llm_summary.py and create_important_contacts_summary.py
+"""
+
+import json
+from pathlib import Path
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import re
+from functools import lru_cache
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Precompiled patterns for subject and snippet cleanup
+_RE_UTF8_Q = re.compile(r'=\?UTF-8\?Q\?.*?\?=')
+_RE_CRLF = re.compile(r'\r\n\s*')
+_RE_WS = re.compile(r'\s+')
+_RE_BLANKS = re.compile(r'\n\s*\n\s*\n')
+
+# Sort key for interactions whose date cannot be parsed
+_OLDEST_EMAIL_DATE = datetime.min.replace(tzinfo=timezone.utc)
+
+# Common subject prefixes stripped by clean_subject
+_PREFIXES = ('Re: ', 'RE: ', 'Fwd: ', 'FWD: ', 'Limited Availability Re: ', 'Parental Leave Re: ')
+
+# Relationship indicators and the subject keywords that signal them
+_INDICATOR_KEYWORDS = {
+    'Meetings/Calls': ['meeting', 'call', 'discussion', 'invitation', 'catch up', 'follow up'],
+    'Active Collaboration': ['collaboration', 'project', 'partnership', 'proposal', 'application'],
+    'Formal Government': ['[SEC=OFFICIAL]', 'official', 'clearance', 'submission'],
+    'Funding Related': ['fund', 'grant', 'budget', 'funding', 'drf', 'disaster ready fund'],
+}
+_INDICATOR_BY_KEYWORD = {
+    keyword.lower(): indicator
+    for indicator, keywords in _INDICATOR_KEYWORDS.items()
+    for keyword in keywords
+}
+# Zero-width lookahead so overlapping keywords from different indicators are all seen
+_INDICATOR_RE = re.compile('(?=(' + '|'.join(map(re.escape, _INDICATOR_BY_KEYWORD)) + '))')
+
+# Substring patterns used by categorize_organization
+_INTL_GOV_EDU_RE = re.compile(r'\.gov|\.edu')
+_NGO_RE = re.compile(r'foundation|charity|ngo|nonprofit')
+_RESEARCH_RE = re.compile(r'research|institute|think tank|university')
+_BUSINESS_TLD_RE = re.compile(r'\.com|\.org|\.net')
+_PERSONAL_DOMAIN_RE = re.compile(r'gmail\.com|hotmail\.com|outlook\.com')
+
+@lru_cache(maxsize=65536)
+def clean_subject(subject):
+    """Clean email subject for better readability"""
+    if not subject:
+        return ""
+    
+    # Remove common email artifacts
+    subject = _RE_UTF8_Q.sub('', subject)
+    subject = _RE_CRLF.sub(' ', subject)
+    subject = _RE_WS.sub(' ', subject)
+    
+    # Remove common prefixes
+    if subject.startswith(_PREFIXES):
+        for prefix in _PREFIXES:
+            if subject.startswith(prefix):
+                subject = subject[len(prefix):]
+                break
+    
+    return subject.strip()
+
+@lru_cache(maxsize=131072)
+def _parse_email_date(date):
+    """Parse an RFC 2822 email date, caching results since dates repeat across threads
+    
+    Dates that don't match the usual format fall back to the more lenient email.utils
+    parser; missing or malformed dates parse as the oldest possible date, so they sort
+    last instead of preventing the rest of a contact's interactions from being sorted.
+    """
+    try:
+        return datetime.strptime(date, '%a, %d %b %Y %H:%M:%S %z')
+    except (TypeError, ValueError):
+        pass
+    try:
+        parsed = parsedate_to_datetime(date)
+    except (TypeError, ValueError):
+        return _OLDEST_EMAIL_DATE
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def sort_interactions_by_date(interactions_data):
+    """Sort each contact's interactions by date (most recent first), once at load time"""
+    for email, interactions in interactions_data.items():
+        interactions_data[email] = sorted(interactions,
+                                          key=lambda x: _parse_email_date(x.get('date')),
+                                          reverse=True)
+
+def load_interactions(interactions_file):
+    """Load the interactions JSON file with each contact's interactions sorted by date"""
+    if ORJSON_AVAILABLE:
+        interactions_data = orjson.loads(Path(interactions_file).read_bytes())
+    else:
+        with open(interactions_file, 'r', encoding='utf-8') as f:
+            interactions_data = json.load(f)
+    sort_interactions_by_date(interactions_data)
+    return interactions_data
+
+def iter_interactions(interactions_file):
+    """Yield (email, interactions) pairs from the interactions JSON file, streaming it when ijson is available"""
+    if IJSON_AVAILABLE:
+        with open(interactions_file, 'rb') as f:
+            yield from ijson.kvitems(f, '')
+    elif ORJSON_AVAILABLE:
+        yield from orjson.loads(Path(interactions_file).read_bytes()).items()
+    else:
+        with open(interactions_file, 'r', encoding='utf-8') as f:
+            yield from json.load(f).items()
+
+def find_relationship_indicators(cleaned_subjects, total_interactions):
+    """Identify relationship indicators from cleaned subjects and interaction frequency"""
+    # Look for meeting/collaboration indicators in a single scan of the lowercased subject text
+    found_indicators = set()
+    for match in _INDICATOR_RE.finditer(' '.join(cleaned_subjects).lower()):
+        found_indicators.add(_INDICATOR_BY_KEYWORD[match.group(1)])
+        if len(found_indicators) == len(_INDICATOR_KEYWORDS):
+            break
+    relationship_indicators = [indicator for indicator in _INDICATOR_KEYWORDS if indicator in found_indicators]
+    
+    # Check interaction frequency for relationship strength
+    if total_interactions >= 20:
+        relationship_indicators.append('High Engagement')
+    elif total_interactions >= 10:
+        relationship_indicators.append('Regular Contact')
+    elif total_interactions >= 5:
+        relationship_indicators.append('Moderate Contact')
+    
+    return relationship_indicators
+
+def build_email_snippets(interactions, cleaned_subjects):
+    """Format the substantial body snippets of interactions with their date and subject"""
+    email_snippets = []
+    
+    for interaction, subject in zip(interactions, cleaned_subjects):
+        snippet = interaction.get('body_snippet', '')
+        if snippet and len(snippet.strip()) > 50:  # Must be substantial
+            # Clean up the snippet
+            clean_snippet = snippet.replace('\r\n', '\n').replace('\r', '\n')
+            clean_snippet = _RE_BLANKS.sub('\n\n', clean_snippet)
+            clean_snippet = clean_snippet.strip()
+            
+            # Add context about when this was sent
+            date = interaction.get('date', '')
+            date_part = date.partition(',')[2].partition(',')[0].strip() if ',' in date else date
+            
+            snippet_with_context = f"[{date_part} - {subject}]\n{clean_snippet}"
+            email_snippets.append(snippet_with_context)
+    
+    return email_snippets
+
+def categorize_organization(domain, organization, email):
+    """Categorize the type of organization"""
+    domain_lower = domain.lower()
+    org_lower = organization.lower() if organization else ""
+    
+    # Government categories (state domains such as .qld.gov.au all contain .gov.au)
+    if '.gov.au' in domain_lower:
+        return 'Australian Government'
+    elif '.edu.au' in domain_lower:
+        return 'Australian University'
+    elif '.org.au' in domain_lower:
+        return 'Australian Organization'
+    elif '.com.au' in domain_lower:
+        return 'Australian Business'
+    
+    # International government/academic
+    elif _INTL_GOV_EDU_RE.search(domain_lower):
+        return 'International Gov/Academic'
+    
+    # NGOs and foundations
+    elif _NGO_RE.search(org_lower):
+        return 'NGO/Foundation'
+    
+    # Research and think tanks
+    elif _RESEARCH_RE.search(org_lower):
+        return 'Research/Think Tank'
+    
+    # Business/Corporate
+    elif _BUSINESS_TLD_RE.search(domain_lower):
+        if _PERSONAL_DOMAIN_RE.search(domain_lower):
+            return 'Individual/Personal'
+        else:
+            return 'Business/Corporate'
+    
+    return 'Other'
+
+@lru_cache(maxsize=4096)
+def derive_organization_from_domain(domain):
+    """Try to derive organization name from domain (cached, since many contacts share a domain)"""
+    if not domain:
+        return ""
+    
+    # Remove common TLDs and subdomains
+    domain_parts = domain.lower().split('.')
+    
+    # Handle Australian government domains
+    if 'gov.au' in domain:
+        if len(domain_parts) >= 3:
+            return domain_parts[-3].upper()  # e.g., 'sa' from 'sa.gov.au'
+        return "Australian Government"
+    
+    # Handle other domains
+    if len(domain_parts) >= 2:
+        org_name = domain_parts[-2]
+        # Capitalize first letter
+        return org_name.capitalize()
+    
+    return domain
@@ -5,93 +5,32 @@ Pulls maximum context (20 emails) for each important contact
 """
 
 import pandas as pd
-import json
-from pathlib import Path
+import numpy as np
 import click
-from datetime import datetime
-import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
-def clean_subject(subject):
-    """Clean email subject for better readability"""
-    if not subject:
-        return ""
-    
-    # Remove common email artifacts
-    subject = re.sub(r'=\?UTF-8\?Q\?.*?\?=', '', subject)
-    subject = re.sub(r'\r\n\s*', ' ', subject)
-    subject = re.sub(r'\s+', ' ', subject)
-    
-    # Remove common prefixes
-    prefixes = ['Re: ', 'RE: ', 'Fwd: ', 'FWD: ', 'Limited Availability Re: ', 'Parental Leave Re: ']
-    for prefix in prefixes:
-        if subject.startswith(prefix):
-            subject = subject[len(prefix):]
-            break
-    
-    return subject.strip()
+from contact_summary_common import (
+    clean_subject,
+    categorize_organization,
+    derive_organization_from_domain,
+    load_interactions,
+    find_relationship_indicators,
+    build_email_snippets,
+)
+
+# Engagement levels by minimum interaction count ('None' means no interactions)
+_ENGAGEMENT_THRESHOLDS = np.array([-np.inf, 1, 5, 10, 20, 50])
+_ENGAGEMENT_LEVELS = np.array(['None', 'Minimal', 'Low', 'Medium', 'High', 'Very High'], dtype=object)
 
 def extract_domain_from_email(email):
     """Extract domain from email address"""
     return email.split('@')[1] if '@' in email else ''
 
-def categorize_organization(domain, organization, email):
-    """Categorize the type of organization"""
-    domain_lower = domain.lower()
-    org_lower = organization.lower() if organization else ""
-    email_lower = email.lower()
-    
-    # Government categories
-    if any(pattern in domain_lower for pattern in ['.gov.au', '.qld.gov.au', '.nsw.gov.au', '.vic.gov.au', '.sa.gov.au', '.wa.gov.au', '.tas.gov.au', '.act.gov.au', '.nt.gov.au']):
-        return 'Australian Government'
-    elif '.edu.au' in domain_lower:
-        return 'Australian University'
-    elif '.org.au' in domain_lower:
-        return 'Australian Organization'
-    elif '.com.au' in domain_lower:
-        return 'Australian Business'
-    
-    # International government/academic
-    elif any(pattern in domain_lower for pattern in ['.gov', '.edu']):
-        return 'International Gov/Academic'
-    
-    # NGOs and foundations
-    elif any(pattern in org_lower for pattern in ['foundation', 'charity', 'ngo', 'nonprofit']):
-        return 'NGO/Foundation'
-    
-    # Research and think tanks
-    elif any(pattern in org_lower for pattern in ['research', 'institute', 'think tank', 'university']):
-        return 'Research/Think Tank'
-    
-    # Business/Corporate
-    elif any(pattern in domain_lower for pattern in ['.com', '.org', '.net']):
-        if 'gmail.com' in domain_lower or 'hotmail.com' in domain_lower or 'outlook.com' in domain_lower:
-            return 'Individual/Personal'
-        else:
-            return 'Business/Corporate'
-    
-    return 'Other'
-
-def derive_organization_from_domain(domain):
-    """Try to derive organization name from domain"""
-    if not domain:
-        return ""
-    
-    # Remove common TLDs and subdomains
-    domain_parts = domain.lower().split('.')
-    
-    # Handle Australian government domains
-    if 'gov.au' in domain:
-        if len(domain_parts) >= 3:
-            return domain_parts[-3].upper()  # e.g., 'sa' from 'sa.gov.au'
-        return "Australian Government"
-    
-    # Handle other domains
-    if len(domain_parts) >= 2:
-        org_name = domain_parts[-2]
-        # Capitalize first letter
-        return org_name.capitalize()
-    
-    return domain
+def engagement_levels(interaction_counts):
+    """Map interaction counts to engagement levels in a single vectorized lookup"""
+    counts = np.nan_to_num(np.asarray(interaction_counts, dtype=float), nan=0.0)
+    return _ENGAGEMENT_LEVELS[np.searchsorted(_ENGAGEMENT_THRESHOLDS, counts, side='right') - 1]
 
 def extract_recent_context(interactions_data, email, max_interactions=20):
     """Extract recent interaction context for an email with maximum context"""
@@ -103,26 +42,21 @@ def extract_recent_context(interactions_data, email, max_interactions=20):
             'best_email_sample': '',
             'first_contact': '',
             'last_contact': '',
-            'interaction_count': 0,
-            'engagement_level': 'None'
+            'interaction_count': 0
         }
     
+    # Already sorted most recent first by sort_interactions_by_date
     interactions = interactions_data[email]
     
-    # Sort by date (most recent first) if we have dates
-    try:
-        interactions_sorted = sorted(interactions, 
-                                   key=lambda x: datetime.strptime(x['date'], '%a, %d %b %Y %H:%M:%S %z'), 
-                                   reverse=True)
-    except:
-        # Fall back to original order if date parsing fails
-        interactions_sorted = interactions
+    # Clean every subject once and reuse it for subjects, indicators and snippets
+    cleaned_subjects = [clean_subject(i.get('subject', '')) for i in interactions]
     
     # Get recent subjects
     recent_subjects = []
-    for interaction in interactions_sorted[:10]:  # More subjects for important contacts
-        subject = clean_subject(interaction.get('subject', ''))
-        if subject and subject not in recent_subjects:
+    seen_subjects = set()
+    for subject in cleaned_subjects[:10]:  # More subjects for important contacts
+        if subject and subject not in seen_subjects:
+            seen_subjects.add(subject)
             recent_subjects.append(subject)
     
     # Create interaction summary
@@ -131,78 +65,26 @@ def extract_recent_context(interactions_data, email, max_interactions=20):
     first_contact = ""
     last_contact = ""
     
-    if interactions_sorted:
+    if interactions:
         try:
-            latest_date = interactions_sorted[0].get('date', '')
-            oldest_date = interactions_sorted[-1].get('date', '')
+            latest_date = interactions[0].get('date', '')
+            oldest_date = interactions[-1].get('date', '')
             last_contact = latest_date
             first_contact = oldest_date
             if latest_date and oldest_date:
-                latest_day = latest_date.split()[0] if latest_date else ""
-                oldest_day = oldest_date.split()[0] if oldest_date else ""
+                latest_day = latest_date.split(None, 1)[0]
+                oldest_day = oldest_date.split(None, 1)[0]
                 date_range = f"({oldest_day}, to {latest_day},)"
         except:
             pass
     
     interaction_summary = f"{total_interactions} interactions {date_range}".strip()
     
-    # Determine engagement level
-    if total_interactions >= 50:
-        engagement_level = "Very High"
-    elif total_interactions >= 20:
-        engagement_level = "High"
-    elif total_interactions >= 10:
-        engagement_level = "Medium"
-    elif total_interactions >= 5:
-        engagement_level = "Low"
-    else:
-        engagement_level = "Minimal"
-    
     # Identify relationship indicators
-    all_subjects = [clean_subject(i.get('subject', '')) for i in interactions]
-    relationship_indicators = []
-    
-    # Look for meeting/collaboration indicators
-    meeting_keywords = ['meeting', 'call', 'discussion', 'invitation', 'catch up', 'follow up']
-    collaboration_keywords = ['collaboration', 'project', 'partnership', 'proposal', 'application']
-    formal_keywords = ['[SEC=OFFICIAL]', 'official', 'clearance', 'submission']
-    funding_keywords = ['fund', 'grant', 'budget', 'funding', 'drf', 'disaster ready fund']
-    
-    if any(keyword in ' '.join(all_subjects).lower() for keyword in meeting_keywords):
-        relationship_indicators.append('Meetings/Calls')
-    if any(keyword in ' '.join(all_subjects).lower() for keyword in collaboration_keywords):
-        relationship_indicators.append('Active Collaboration')
-    if any(keyword in ' '.join(all_subjects).lower() for keyword in formal_keywords):
-        relationship_indicators.append('Formal Government')
-    if any(keyword in ' '.join(all_subjects).lower() for keyword in funding_keywords):
-        relationship_indicators.append('Funding Related')
-    
-    # Check interaction frequency for relationship strength
-    if total_interactions >= 20:
-        relationship_indicators.append('High Engagement')
-    elif total_interactions >= 10:
-        relationship_indicators.append('Regular Contact')
-    elif total_interactions >= 5:
-        relationship_indicators.append('Moderate Contact')
+    relationship_indicators = find_relationship_indicators(cleaned_subjects, total_interactions)
     
     # Combine multiple email snippets for rich context (MAX 20 emails)
-    email_snippets = []
-    
-    for interaction in interactions_sorted[:max_interactions]:  # Take up to max_interactions
-        snippet = interaction.get('body_snippet', '')
-        if snippet and len(snippet.strip()) > 50:  # Must be substantial
-            # Clean up the snippet
-            clean_snippet = snippet.replace('\r\n', '\n').replace('\r', '\n')
-            clean_snippet = re.sub(r'\n\s*\n\s*\n', '\n\n', clean_snippet)
-            clean_snippet = clean_snippet.strip()
-            
-            # Add context about when this was sent
-            subject = clean_subject(interaction.get('subject', ''))
-            date = interaction.get('date', '')
-            date_part = date.split(',')[1].strip() if ',' in date else date
-            
-            snippet_with_context = f"[{date_part} - {subject}]\n{clean_snippet}"
-            email_snippets.append(snippet_with_context)
+    email_snippets = build_email_snippets(interactions[:max_interactions], cleaned_subjects)
     
     # Combine snippets with separators
     best_email_sample = "\n\n---\n\n".join(email_snippets)
@@ -218,8 +100,7 @@ def extract_recent_context(interactions_data, email, max_interactions=20):
         'best_email_sample': best_email_sample,
         'first_contact': first_contact,
         'last_contact': last_contact,
-        'interaction_count': total_interactions,
-        'engagement_level': engagement_level
+        'interaction_count': total_interactions
     }
 
 def load_important_contacts(contacts_file):
@@ -232,7 +113,66 @@ def load_important_contacts(contacts_file):
                 contacts.append(email)
     return contacts
 
-def create_important_contacts_summary(important_contacts_file, interactions_file, output_file):
+def summarize_contact(interactions_data, email):
+    """Build the summary record for a single important contact"""
+    # Extract domain and derive basic info
+    domain = extract_domain_from_email(email)
+    organization = derive_organization_from_domain(domain)
+    
+    # Extract context from interactions (with max 20 emails)
+    context = extract_recent_context(interactions_data, email, max_interactions=20)
+    
+    # Categorize organization
+    org_category = categorize_organization(domain, organization, email)
+    
+    # Determine if Australian government
+    is_australian_gov = org_category == 'Australian Government'
+    
+    # Create contact name from email (fallback)
+    contact_name = email.split('@')[0].replace('.', ' ').title()
+    
+    # Compile summary record
+    return {
+        'contact_name': contact_name,
+        'email': email,
+        'domain': domain,
+        'organization': organization,
+        'organization_category': org_category,
+        'is_australian_government': is_australian_gov,
+        'interaction_count': context['interaction_count'],
+        'first_contact': context['first_contact'],
+        'last_contact': context['last_contact'],
+        'interaction_summary': context['interaction_summary'],
+        'recent_email_subjects': context['recent_subjects'],
+        'relationship_indicators': context['relationship_indicators'],
+        'sample_email_context': context['best_email_sample']
+    }
+
+# Interaction data shared with worker processes, set once per worker
+_worker_interactions_data = None
+
+def _init_worker(interactions_data):
+    """Store the read-only interaction data in a worker process"""
+    global _worker_interactions_data
+    _worker_interactions_data = interactions_data
+
+def _summarize_contact_in_worker(email):
+    """Summarize a contact using the worker's copy of the interaction data"""
+    return summarize_contact(_worker_interactions_data, email)
+
+def summarize_contacts(interactions_data, emails, workers=1):
+    """Yield summary records for emails in order, spread across worker processes if workers > 1"""
+    if workers <= 1:
+        for email in emails:
+            yield summarize_contact(interactions_data, email)
+        return
+    
+    chunksize = max(1, len(emails) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(interactions_data,)) as executor:
+        yield from executor.map(_summarize_contact_in_worker, emails, chunksize=chunksize)
+
+def create_important_contacts_summary(important_contacts_file, interactions_file, output_file, workers=1):
     """Create comprehensive summary for important contacts only with maximum context"""
     
     print("Loading important contacts and interactions...")
@@ -242,75 +182,44 @@ def create_important_contacts_summary(important_contacts_file, interactions_file
     print(f"Loaded {len(important_emails)} important contacts")
     
     # Load interactions
-    with open(interactions_file, 'r') as f:
-        interactions_data = json.load(f)
+    interactions_data = load_interactions(interactions_file)
     print(f"Loaded interaction data for {len(interactions_data)} total contacts")
     
-    # Create enhanced summary for important contacts only
-    summary_data = []
+    # Create enhanced summary for important contacts only, collected column by column
+    summary_data = defaultdict(list)
     
-    for email in important_emails:
+    records = summarize_contacts(interactions_data, important_emails, workers)
+    for email, summary_record in zip(important_emails, records):
         print(f"Processing {email}...")
-        
-        # Extract domain and derive basic info
-        domain = extract_domain_from_email(email)
-        organization = derive_organization_from_domain(domain)
-        
-        # Extract context from interactions (with max 20 emails)
-        context = extract_recent_context(interactions_data, email, max_interactions=20)
-        
-        # Categorize organization
-        org_category = categorize_organization(domain, organization, email)
-        
-        # Determine if Australian government
-        is_australian_gov = org_category == 'Australian Government'
-        
-        # Create contact name from email (fallback)
-        contact_name = email.split('@')[0].replace('.', ' ').title()
-        
-        # Compile summary record
-        summary_record = {
-            'contact_name': contact_name,
-            'email': email,
-            'domain': domain,
-            'organization': organization,
-            'organization_category': org_category,
-            'is_australian_government': is_australian_gov,
-            'interaction_count': context['interaction_count'],
-            'engagement_level': context['engagement_level'],
-            'first_contact': context['first_contact'],
-            'last_contact': context['last_contact'],
-            'interaction_summary': context['interaction_summary'],
-            'recent_email_subjects': context['recent_subjects'],
-            'relationship_indicators': context['relationship_indicators'],
-            'sample_email_context': context['best_email_sample']
-        }
-        
-        summary_data.append(summary_record)
+        for column, value in summary_record.items():
+            summary_data[column].append(value)
     
     # Create DataFrame and save
     summary_df = pd.DataFrame(summary_data)
     
-    # Sort by interaction count (descending) then by engagement level
-    engagement_order = {'Very High': 5, 'High': 4, 'Medium': 3, 'Low': 2, 'Minimal': 1, 'None': 0}
-    summary_df['engagement_sort'] = summary_df['engagement_level'].map(engagement_order)
-    summary_df = summary_df.sort_values(['interaction_count', 'engagement_sort'], ascending=[False, False])
-    summary_df = summary_df.drop('engagement_sort', axis=1)
+    # Determine engagement levels for all contacts at once
+    summary_df.insert(summary_df.columns.get_loc('interaction_count') + 1, 'engagement_level',
+                      engagement_levels(summary_df['interaction_count']))
+    
+    # Sort by interaction count (descending); engagement level follows from the count,
+    # so a stable single-key sort gives the same order without a temporary sort column
+    summary_df = summary_df.sort_values('interaction_count', ascending=False, kind='stable')
     
     # Save to CSV
     summary_df.to_csv(output_file, index=False)
     print(f"\nSaved focused summary to {output_file}")
     print(f"Total important contacts processed: {len(summary_df)}")
-    print(f"Contacts with interactions: {len(summary_df[summary_df['interaction_count'] > 0])}")
-    print(f"High engagement contacts: {len(summary_df[summary_df['engagement_level'].isin(['High', 'Very High'])])}")
+    print(f"Contacts with interactions: {(summary_df['interaction_count'] > 0).sum()}")
+    print(f"High engagement contacts: {summary_df['engagement_level'].isin(['High', 'Very High']).sum()}")
 
 @click.command()
 @click.option('--important-contacts', default='important_contacts.txt', help='Important contacts text file')
 @click.option('--interactions-file', default='output/contact_interactions.json', help='Interactions JSON file')
 @click.option('--output-file', default='output/important_contacts_llm_summary.csv', help='Output summary CSV for important contacts')
-def main(important_contacts, interactions_file, output_file):
+@click.option('--workers', default=1, type=int, help='Worker processes for per-contact processing (default: 1)')
+def main(important_contacts, interactions_file, output_file, workers):
     """Create focused LLM summary for important contacts with maximum context"""
-    create_important_contacts_summary(important_contacts, interactions_file, output_file)
+    create_important_contacts_summary(important_contacts, interactions_file, output_file, workers)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -6,19 +6,156 @@ Extracts government contacts from Google Takeout MBOX files
 
 import os
 import re
+import sys
 import json
-import mailbox
 import email
-from email.utils import parseaddr, getaddresses
+from email.parser import BytesHeaderParser
+from email.utils import parseaddr, getaddresses, parsedate
 from datetime import datetime
-from collections import defaultdict, Counter
+from collections import defaultdict, deque, Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from functools import lru_cache
 from typing import Dict, List, Set, Optional, Tuple
 import pandas as pd
 from pathlib import Path
 import click
 from tqdm import tqdm
 import csv
-from email_validator import validate_email, EmailNotValidError
+import heapq
+import binascii
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Basic addr-spec shape check for parsed header addresses (no DNS lookups)
+_ADDR_RE = re.compile(r'^[^@\s<>]+@[^@\s<>]+\.[^@\s<>]+\Z')
+
+# Header-only parser used to check the sender before parsing a whole message
+_HEADER_PARSER = BytesHeaderParser()
+
+# Messages sent to a worker process at a time when parsing in parallel
+_WORKER_BATCH_SIZE = 64
+
+# Australian suffixes stripped by guess_organization_from_domain
+_AU_SUFFIX_RE = re.compile(r'\.(?:gov|org|edu)\.au')
+
+# Common government department mappings used by guess_organization_from_domain
+_DEPT_MAPPINGS = {
+    'treasury': 'Department of Treasury',
+    'finance': 'Department of Finance',
+    'agriculture': 'Department of Agriculture',
+    'industry': 'Department of Industry',
+    'health': 'Department of Health',
+    'education': 'Department of Education',
+    'environment': 'Department of Environment',
+    'defence': 'Department of Defence',
+    'dfat': 'Department of Foreign Affairs and Trade',
+    'austrade': 'Australian Trade and Investment Commission',
+    'csiro': 'Commonwealth Scientific and Industrial Research Organisation',
+    'abs': 'Australian Bureau of Statistics',
+    'rba': 'Reserve Bank of Australia',
+    'accc': 'Australian Competition and Consumer Commission',
+}
+
+# Email bodies are truncated to this many characters
+_BODY_LIMIT = 5000
+# Payload bytes that always hold _BODY_LIMIT characters of valid UTF-8 (at most 4 bytes each)
+_BODY_BYTES_LIMIT = _BODY_LIMIT * 4
+# Base64 characters, line breaks included, that decode to more than _BODY_BYTES_LIMIT bytes
+_BASE64_PREFIX_CHARS = _BODY_BYTES_LIMIT * 2
+
+# Transfer encodings whose payload must be decoded before it can be read as text
+_ENCODED_TRANSFER_ENCODINGS = {'quoted-printable', 'base64', 'x-uuencode', 'uuencode', 'uue', 'x-uue'}
+
+# Common signature patterns, compiled once rather than on every message
+_SIGNATURE_PATTERNS = [
+    re.compile(pattern, re.MULTILINE | re.IGNORECASE)
+    for pattern in (
+        r'(?:^|\n)([^,\n]+),?\s*\n[^@\n]*@[^@\n]+\.(?:gov|org|edu)\.au',
+        r'(?:^|\n)([A-Z][^,\n]{10,50})\s*\n.*?(?:gov|org|edu)\.au',
+        r'(?:Department of|Ministry of|Office of|Agency for)\s+([A-Z][^,\n]{5,40})',
+        r'(?:^|\n)([A-Z][^,\n]{5,40})\s*(?:Department|Ministry|Office|Agency|Commission)',
+    )
+]
+
+# Literal text each signature pattern needs, found in one pass so patterns that can't match are skipped:
+# the first two patterns need an Australian domain, the last two a department-style word
+_SIGNATURE_HINT_RE = re.compile(
+    r'(?P<au_domain>(?:gov|org|edu)\.au)|(?P<department>department|ministry|office|agency|commission)',
+    re.IGNORECASE
+)
+_SIGNATURE_PATTERN_HINTS = ('au_domain', 'au_domain', 'department', 'department')
+
+
+def _suffix_pattern(suffixes) -> re.Pattern:
+    """Compile a case-insensitive pattern matching any of the domain suffixes at the end of an address"""
+    alternatives = '|'.join(re.escape(suffix) for suffix in sorted(suffixes, key=len, reverse=True))
+    return re.compile(rf'(?:{alternatives})\Z', re.IGNORECASE)
+
+
+def _payload_text(part) -> str:
+    """Return the start of a message part's payload as text, decoding no more of it than a body needs"""
+    cte = str(part.get('content-transfer-encoding', '')).lower()
+    payload = part.get_payload()
+    if cte not in _ENCODED_TRANSFER_ENCODINGS and isinstance(payload, str) and payload.isascii():
+        # ASCII text encodes and decodes back to itself, so it can be used as is
+        return payload[:_BODY_LIMIT]
+    
+    if cte == 'base64' and isinstance(payload, str) and len(payload) > _BASE64_PREFIX_CHARS:
+        # Base64 decodes in independent 4-character groups, so large parts only need their start decoded
+        encoded = ''.join(payload[:_BASE64_PREFIX_CHARS].split())
+        try:
+            text = binascii.a2b_base64(encoded[:len(encoded) - len(encoded) % 4]).decode('utf-8', errors='ignore')
+        except binascii.Error:
+            text = ''
+        if len(text) >= _BODY_LIMIT:
+            return text[:_BODY_LIMIT]
+    
+    payload_bytes = part.get_payload(decode=True)
+    text = payload_bytes[:_BODY_BYTES_LIMIT].decode('utf-8', errors='ignore')
+    if len(text) < _BODY_LIMIT and len(payload_bytes) > _BODY_BYTES_LIMIT:
+        # Undecodable bytes were dropped, so more of the payload is needed after all
+        text = payload_bytes.decode('utf-8', errors='ignore')
+    return text[:_BODY_LIMIT]
+
+
+def _email_year(date) -> int:
+    """Return the year of an email Date header (RFC 2822 or ISO 8601), or 0 if it can't be parsed"""
+    if not date:
+        return 0
+    parsed = parsedate(str(date))
+    if parsed:
+        return parsed[0]
+    try:
+        return datetime.fromisoformat(str(date)).year
+    except ValueError:
+        return 0
+
+
+@lru_cache(maxsize=10000)
+def _organization_from_signature(body: str) -> Optional[str]:
+    """Match the signature patterns against a body, cached since replies often repeat a body"""
+    hints = set()
+    for match in _SIGNATURE_HINT_RE.finditer(body):
+        hints.add(match.lastgroup)
+        if len(hints) == 2:
+            break
+    
+    for pattern, hint in zip(_SIGNATURE_PATTERNS, _SIGNATURE_PATTERN_HINTS):
+        if hint not in hints:
+            continue
+        # Only the first match of each pattern is considered
+        match = pattern.search(body)
+        if match:
+            org = match.group(1).strip()
+            if len(org) > 5 and not '@' in org:
+                return org
+    
+    return None
 
 
 class EmailContactExtractor:
@@ -37,24 +174,27 @@ class EmailContactExtractor:
             'allfed.info', 'allfed.org', 'allfed.net'
         }
         
+        # Suffix matchers built once from the domain sets above
+        self._au_gov_re = _suffix_pattern(self.au_gov_domains)
+        self._internal_re = _suffix_pattern(self.internal_domains)
+        
         # Contact storage
         self.contacts = {}
         self.email_threads = defaultdict(list)
         
     def is_australian_government_domain(self, email_addr: str) -> bool:
         """Check if email domain is Australian government/org"""
-        domain = email_addr.split('@')[-1].lower()
-        return any(domain.endswith(suffix) for suffix in self.au_gov_domains)
+        return bool(self._au_gov_re.search(email_addr))
     
     def is_internal_email(self, email_addr: str) -> bool:
         """Check if email is internal ALLFED email"""
-        domain = email_addr.split('@')[-1].lower()
-        return any(domain.endswith(suffix) for suffix in self.internal_domains)
+        return bool(self._internal_re.search(email_addr))
     
     def extract_email_info(self, msg) -> Dict:
         """Extract relevant information from email message"""
         info = {
-            'subject': msg.get('Subject', ''),
+            # Raw 8-bit headers come back as (unhashable) Header objects; subjects are counted, so use text
+            'subject': str(msg.get('Subject', '')),
             'date': msg.get('Date', ''),
             'from': msg.get('From', ''),
             'to': msg.get('To', ''),
@@ -74,16 +214,16 @@ class EmailContactExtractor:
             for part in msg.walk():
                 if part.get_content_type() == "text/plain":
                     try:
-                        body = part.get_payload(decode=True).decode('utf-8', errors='ignore')
+                        body = _payload_text(part)
                         break
                     except:
                         continue
         else:
             try:
-                body = msg.get_payload(decode=True).decode('utf-8', errors='ignore')
+                body = _payload_text(msg)
             except:
                 body = str(msg.get_payload())
-        return body[:5000]  # Limit body length
+        return body[:_BODY_LIMIT]  # Limit body length
     
     def parse_email_addresses(self, addr_string: str) -> List[Tuple[str, str]]:
         """Parse email addresses from header string"""
@@ -95,13 +235,9 @@ class EmailContactExtractor:
             validated_addresses = []
             
             for name, email_addr in addresses:
-                if email_addr:
-                    try:
-                        # Basic validation
-                        validate_email(email_addr)
-                        validated_addresses.append((name.strip(), email_addr.strip().lower()))
-                    except EmailNotValidError:
-                        continue
+                # Basic validation
+                if email_addr and _ADDR_RE.match(email_addr):
+                    validated_addresses.append((name.strip(), email_addr.strip().lower()))
             
             return validated_addresses
         except Exception as e:
@@ -110,79 +246,128 @@ class EmailContactExtractor:
     
     def extract_organization_from_signature(self, body: str) -> Optional[str]:
         """Extract organization name from email signature"""
-        # Common signature patterns
-        patterns = [
-            r'(?:^|\n)([^,\n]+),?\s*\n[^@\n]*@[^@\n]+\.(?:gov|org|edu)\.au',
-            r'(?:^|\n)([A-Z][^,\n]{10,50})\s*\n.*?(?:gov|org|edu)\.au',
-            r'(?:Department of|Ministry of|Office of|Agency for)\s+([A-Z][^,\n]{5,40})',
-            r'(?:^|\n)([A-Z][^,\n]{5,40})\s*(?:Department|Ministry|Office|Agency|Commission)',
-        ]
+        return _organization_from_signature(body)
+    
+    def iter_mbox_messages(self):
+        """Stream raw messages from the MBOX file, yielding (message bytes, bytes read)
+        
+        Messages are split on lines starting with 'From ', the same way mailbox.mbox
+        does, but without building an index of the whole file first.
+        """
+        lines = None
+        size = 0
+        last_was_empty = False
+        
+        with open(self.mbox_path, 'rb') as f:
+            for line in f:
+                if line.startswith(b'From '):
+                    if lines is not None:
+                        yield b''.join(lines[:-1] if last_was_empty else lines), size
+                        size = 0
+                    # The 'From ' separator line itself is not part of the message
+                    lines = []
+                    size += len(line)
+                    last_was_empty = False
+                    continue
+                
+                size += len(line)
+                if lines is not None:
+                    lines.append(line)
+                last_was_empty = line == b'\n'
+        
+        if lines is not None:
+            yield b''.join(lines[:-1] if last_was_empty else lines), size
+    
+    def extract_sent_email(self, raw_message: bytes) -> Optional[Dict]:
+        """Parse a raw message, returning its details if it was sent to external recipients"""
+        # Check if this is a sent email (usually in Sent folder or has specific headers),
+        # parsing only the headers so skipped messages never have their body decoded
+        from_addr = _HEADER_PARSER.parsebytes(raw_message).get('From', '')
+        
+        # Skip if no from address
+        if not from_addr:
+            return None
+        
+        # Parse from address
+        from_addresses = self.parse_email_addresses(from_addr)
+        if not from_addresses:
+            return None
+        
+        from_name, from_email = from_addresses[0]
+        
+        # Check if this is likely a sent email (from ALLFED domain)
+        if not self.is_internal_email(from_email):
+            return None
         
-        for pattern in patterns:
-            matches = re.findall(pattern, body, re.MULTILINE | re.IGNORECASE)
-            if matches:
-                org = matches[0].strip()
-                if len(org) > 5 and not '@' in org:
-                    return org
+        # Extract email info
+        email_info = self.extract_email_info(email.message_from_bytes(raw_message))
         
-        return None
+        # Extract recipients, parsing all address headers in one pass (getaddresses joins
+        # field values with ', ' anyway)
+        recipient_headers = [str(email_info[header]) for header in ['to', 'cc', 'bcc'] if email_info[header]]
+        recipients = self.parse_email_addresses(', '.join(recipient_headers))
+        
+        # Filter for external recipients, counting someone listed in several headers once
+        external_recipients = []
+        seen_recipients = set()
+        for name, email_addr in recipients:
+            if email_addr not in seen_recipients and not self.is_internal_email(email_addr):
+                seen_recipients.add(email_addr)
+                external_recipients.append((name, email_addr))
+        
+        if not external_recipients:
+            return None
+        
+        return {
+            'email_info': email_info,
+            'recipients': external_recipients,
+            'from_name': from_name,
+            'from_email': from_email
+        }
     
-    def process_mbox(self) -> None:
+    def iter_sent_emails(self, workers: int = 1):
+        """Yield (sent email or None, bytes read) per message in MBOX order, parsing in worker processes if workers > 1"""
+        if workers <= 1:
+            for raw_message, size in self.iter_mbox_messages():
+                yield self.extract_sent_email(raw_message), size
+            return
+        
+        messages = self.iter_mbox_messages()
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            while True:
+                batch = list(islice(messages, _WORKER_BATCH_SIZE))
+                if batch:
+                    future = executor.submit(_extract_sent_emails_in_worker, [raw for raw, _ in batch])
+                    pending.append((future, [size for _, size in batch]))
+                
+                # Keep a bounded number of batches in flight so the file isn't read far ahead
+                while pending and (not batch or len(pending) >= workers * 2):
+                    future, sizes = pending.popleft()
+                    yield from zip(future.result(), sizes)
+                
+                if not batch:
+                    break
+    
+    def process_mbox(self, workers: int = 1) -> None:
         """Process the MBOX file and extract contacts"""
         print(f"Processing MBOX file: {self.mbox_path}")
         
         try:
-            mbox = mailbox.mbox(self.mbox_path)
-            total_messages = len(mbox)
-            print(f"Found {total_messages} messages")
-            
+            total_messages = 0
             sent_emails = []
             
-            with tqdm(total=total_messages, desc="Processing emails") as pbar:
-                for message in mbox:
-                    pbar.update(1)
-                    
-                    # Extract email info
-                    email_info = self.extract_email_info(message)
-                    
-                    # Check if this is a sent email (usually in Sent folder or has specific headers)
-                    from_addr = email_info['from']
-                    
-                    # Skip if no from address
-                    if not from_addr:
-                        continue
-                    
-                    # Parse from address
-                    from_addresses = self.parse_email_addresses(from_addr)
-                    if not from_addresses:
-                        continue
-                    
-                    from_name, from_email = from_addresses[0]
-                    
-                    # Check if this is likely a sent email (from ALLFED domain)
-                    if not self.is_internal_email(from_email):
-                        continue
-                    
-                    # Extract recipients
-                    recipients = []
-                    for header in ['to', 'cc', 'bcc']:
-                        if email_info[header]:
-                            recipients.extend(self.parse_email_addresses(email_info[header]))
-                    
-                    # Filter for external recipients
-                    external_recipients = [
-                        (name, email_addr) for name, email_addr in recipients
-                        if not self.is_internal_email(email_addr)
-                    ]
-                    
-                    if external_recipients:
-                        sent_emails.append({
-                            'email_info': email_info,
-                            'recipients': external_recipients,
-                            'from_name': from_name,
-                            'from_email': from_email
-                        })
+            # Progress is tracked in bytes, since the message count isn't known up front
+            with tqdm(total=os.path.getsize(self.mbox_path), desc="Processing emails",
+                      unit='B', unit_scale=True, mininterval=0.5) as pbar:
+                for sent_email, size in self.iter_sent_emails(workers):
+                    pbar.update(size)
+                    total_messages += 1
+                    if sent_email:
+                        sent_emails.append(sent_email)
             
+            print(f"Found {total_messages} messages")
             print(f"Found {len(sent_emails)} sent emails with external recipients")
             self.process_sent_emails(sent_emails)
             
@@ -194,44 +379,52 @@ class EmailContactExtractor:
         """Process sent emails to extract contacts"""
         contact_interactions = defaultdict(list)
         
-        for email_data in tqdm(sent_emails, desc="Extracting contacts"):
+        for email_data in tqdm(sent_emails, desc="Extracting contacts", mininterval=0.5):
             email_info = email_data['email_info']
             recipients = email_data['recipients']
+            date = email_info['date']
+            subject = email_info['subject']
+            body = email_info['body']
             
             # Extract organization from email body
-            org_from_signature = self.extract_organization_from_signature(email_info['body'])
+            org_from_signature = self.extract_organization_from_signature(body)
+            
+            # The interaction record is the same for every recipient, so build it once per email
+            interaction = {
+                'date': date,
+                'subject': subject,
+                'body_snippet': body[:300]
+            }
             
             for name, email_addr in recipients:
                 # Skip if already internal
                 if self.is_internal_email(email_addr):
                     continue
                 
-                # Extract domain info
-                domain = email_addr.split('@')[-1]
-                is_au_gov = self.is_australian_government_domain(email_addr)
-                
-                # Create contact entry
+                # Create contact entry, classifying the domain only the first time a contact is seen
                 contact_key = email_addr
+                contact = self.contacts.get(contact_key)
                 
-                if contact_key not in self.contacts:
-                    self.contacts[contact_key] = {
+                if contact is None:
+                    # Many contacts share a domain, so keep a single copy of each domain string
+                    domain = sys.intern(email_addr.split('@')[-1])
+                    contact = self.contacts[contact_key] = {
                         'name': name or '',
                         'email': email_addr,
                         'domain': domain,
-                        'is_australian_government': is_au_gov,
+                        'is_australian_government': self.is_australian_government_domain(email_addr),
                         'organization': org_from_signature or self.guess_organization_from_domain(domain),
-                        'first_contact': email_info['date'],
-                        'last_contact': email_info['date'],
+                        'first_contact': date,
+                        'last_contact': date,
                         'interaction_count': 0,
-                        'subjects': [],
-                        'email_sample': email_info['body'][:2000]
+                        'subjects': Counter(),
+                        'email_sample': body[:2000]
                     }
                 
                 # Update contact info
-                contact = self.contacts[contact_key]
                 contact['interaction_count'] += 1
-                contact['last_contact'] = email_info['date']
-                contact['subjects'].append(email_info['subject'])
+                contact['last_contact'] = date
+                contact['subjects'][subject] += 1
                 
                 # Update name if we have a better one
                 if name and (not contact['name'] or len(name) > len(contact['name'])):
@@ -242,11 +435,7 @@ class EmailContactExtractor:
                     contact['organization'] = org_from_signature
                 
                 # Store interaction
-                contact_interactions[contact_key].append({
-                    'date': email_info['date'],
-                    'subject': email_info['subject'],
-                    'body_snippet': email_info['body'][:300]
-                })
+                contact_interactions[contact_key].append(interaction)
         
         # Save interaction details
         self.save_interaction_details(contact_interactions)
@@ -255,71 +444,73 @@ class EmailContactExtractor:
         au_gov_contacts = [c for c in self.contacts.values() if c['is_australian_government']]
         print(f"Found {len(au_gov_contacts)} Australian government contacts")
     
-    def guess_organization_from_domain(self, domain: str) -> str:
-        """Guess organization name from domain"""
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def guess_organization_from_domain(domain: str) -> str:
+        """Guess organization name from domain (cached, since many contacts share a domain)"""
         # Remove common suffixes
-        domain_clean = domain.replace('.gov.au', '').replace('.org.au', '').replace('.edu.au', '')
-        
-        # Common government department mappings
-        dept_mappings = {
-            'treasury': 'Department of Treasury',
-            'finance': 'Department of Finance',
-            'agriculture': 'Department of Agriculture',
-            'industry': 'Department of Industry',
-            'health': 'Department of Health',
-            'education': 'Department of Education',
-            'environment': 'Department of Environment',
-            'defence': 'Department of Defence',
-            'dfat': 'Department of Foreign Affairs and Trade',
-            'austrade': 'Australian Trade and Investment Commission',
-            'csiro': 'Commonwealth Scientific and Industrial Research Organisation',
-            'abs': 'Australian Bureau of Statistics',
-            'rba': 'Reserve Bank of Australia',
-            'accc': 'Australian Competition and Consumer Commission',
-        }
+        domain_clean = _AU_SUFFIX_RE.sub('', domain)
         
         domain_key = domain_clean.split('.')[0].lower()
-        return dept_mappings.get(domain_key, domain_clean.title())
+        return _DEPT_MAPPINGS.get(domain_key, domain_clean.title())
     
     def save_interaction_details(self, interactions: Dict) -> None:
         """Save detailed interaction data"""
         interactions_file = self.output_dir / "contact_interactions.json"
         
-        # Convert to serializable format
-        serializable_interactions = {}
-        for email, interaction_list in interactions.items():
-            serializable_interactions[email] = interaction_list
+        data = None
+        if ORJSON_AVAILABLE:
+            try:
+                data = orjson.dumps(interactions, default=str, option=orjson.OPT_INDENT_2)
+            except orjson.JSONEncodeError:
+                # e.g. undecodable header bytes left as surrogates, which only json can write
+                pass
         
-        with open(interactions_file, 'w') as f:
-            json.dump(serializable_interactions, f, indent=2, default=str)
+        if data is not None:
+            interactions_file.write_bytes(data)
+        else:
+            with open(interactions_file, 'w') as f:
+                json.dump(interactions, f, indent=2, default=str)
         
         print(f"Saved interaction details to {interactions_file}")
     
+    def write_contacts_csv(self, csv_file: Path, records: List[Dict]) -> None:
+        """Write contact records to CSV directly, in the same format DataFrame.to_csv produces"""
+        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(records[0]), lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(records)
+    
     def export_contacts(self) -> None:
         """Export contacts to various formats"""
-        # Convert to DataFrame
-        df = pd.DataFrame(list(self.contacts.values()))
+        # Flatten each contact's subjects to its most common ones
+        records = [
+            {**contact, 'subjects': '; '.join(subject for subject, _ in contact['subjects'].most_common(10))}
+            for contact in self.contacts.values()
+        ]
         
-        if df.empty:
+        if not records:
             print("No contacts to export")
             return
         
         # Sort by interaction count and Australian government status
-        df = df.sort_values(['is_australian_government', 'interaction_count'], ascending=[False, False])
+        records.sort(key=lambda c: (c['is_australian_government'], c['interaction_count']), reverse=True)
         
         # Export to CSV
         csv_file = self.output_dir / "contacts_all.csv"
-        df.to_csv(csv_file, index=False)
+        self.write_contacts_csv(csv_file, records)
         print(f"Exported all contacts to {csv_file}")
         
         # Export Australian government contacts only
-        au_gov_df = df[df['is_australian_government'] == True]
-        if not au_gov_df.empty:
+        au_gov_records = [c for c in records if c['is_australian_government']]
+        if au_gov_records:
             au_gov_file = self.output_dir / "contacts_australian_government.csv"
-            au_gov_df.to_csv(au_gov_file, index=False)
-            print(f"Exported {len(au_gov_df)} Australian government contacts to {au_gov_file}")
+            self.write_contacts_csv(au_gov_file, au_gov_records)
+            print(f"Exported {len(au_gov_records)} Australian government contacts to {au_gov_file}")
         
         # Export to Excel with multiple sheets
+        df = pd.DataFrame(records)
+        au_gov_df = df[df['is_australian_government'] == True]
         excel_file = self.output_dir / "contacts_summary.xlsx"
         with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
             df.to_excel(writer, sheet_name='All Contacts', index=False)
@@ -333,7 +524,7 @@ class EmailContactExtractor:
                     len(df),
                     len(au_gov_df),
                     len(df[df['interaction_count'] >= 5]),
-                    len(df[df['last_contact'].str.contains('2023|2024', na=False)])
+                    sum(1 for contact in records if _email_year(contact['last_contact']) >= 2023)
                 ]
             })
             summary_df.to_excel(writer, sheet_name='Summary', index=False)
@@ -358,8 +549,8 @@ class EmailContactExtractor:
             au_gov_contacts = [c for c in self.contacts.values() if c['is_australian_government']]
             f.write(f"Australian government contacts: {len(au_gov_contacts)}\n")
             
-            high_interaction = [c for c in self.contacts.values() if c['interaction_count'] >= 5]
-            f.write(f"High interaction contacts (5+ emails): {len(high_interaction)}\n\n")
+            high_interaction = sum(1 for c in self.contacts.values() if c['interaction_count'] >= 5)
+            f.write(f"High interaction contacts (5+ emails): {high_interaction}\n\n")
             
             # Top domains
             f.write("TOP DOMAINS\n")
@@ -373,8 +564,9 @@ class EmailContactExtractor:
             if au_gov_contacts:
                 f.write("TOP AUSTRALIAN GOVERNMENT CONTACTS\n")
                 f.write("-" * 35 + "\n")
-                au_gov_sorted = sorted(au_gov_contacts, key=lambda x: x['interaction_count'], reverse=True)
-                for contact in au_gov_sorted[:10]:
+                # Same order as sorting all of them by interaction count, without the full sort
+                au_gov_top = heapq.nlargest(10, au_gov_contacts, key=lambda x: x['interaction_count'])
+                for contact in au_gov_top:
                     f.write(f"{contact['name']} <{contact['email']}> - {contact['interaction_count']} interactions\n")
                     f.write(f"  Organization: {contact['organization']}\n")
                     f.write(f"  Last contact: {contact['last_contact']}\n\n")
@@ -382,11 +574,25 @@ class EmailContactExtractor:
         print(f"Generated report: {report_file}")
 
 
+# Extractor shared with worker processes, set once per worker
+_worker_extractor = None
+
+def _init_worker(extractor):
+    """Store a copy of the extractor in a worker process"""
+    global _worker_extractor
+    _worker_extractor = extractor
+
+def _extract_sent_emails_in_worker(raw_messages):
+    """Parse a batch of raw messages using the worker's extractor"""
+    return [_worker_extractor.extract_sent_email(raw_message) for raw_message in raw_messages]
+
+
 @click.command()
 @click.option('--mbox', required=True, help='Path to MBOX file')
 @click.option('--output', default='output', help='Output directory')
 @click.option('--llm-enhance', is_flag=True, help='Use LLM to enhance contact descriptions (requires API keys)')
-def main(mbox: str, output: str, llm_enhance: bool):
+@click.option('--workers', default=1, type=int, help='Worker processes for parsing messages (default: 1)')
+def main(mbox: str, output: str, llm_enhance: bool, workers: int):
     """Extract government contacts from MBOX file"""
     
     if not os.path.exists(mbox):
@@ -397,7 +603,7 @@ def main(mbox: str, output: str, llm_enhance: bool):
     extractor = EmailContactExtractor(mbox, output)
     
     # Process MBOX
-    extractor.process_mbox()
+    extractor.process_mbox(workers)
     
     # Export results
     extractor.export_contacts()
@@ -4,15 +4,22 @@ LLM Contact Enhancer for ALLFED Handover
 Uses LLM to analyze email content and provide context about relationships
 """
 
+import asyncio
+import hashlib
 import json
 import os
-from typing import Dict, List, Optional
+import re
+import sqlite3
+import time
+from typing import Callable, Dict, List, Optional
 import pandas as pd
 from pathlib import Path
 import click
-from tqdm import tqdm
+from tqdm.asyncio import tqdm
 from dotenv import load_dotenv
-import requests
+import httpx
+
+from contact_summary_common import iter_interactions
 
 # Import LLM clients
 try:
@@ -27,21 +34,160 @@ try:
 except ImportError:
     ANTHROPIC_AVAILABLE = False
 
+# Faster JSON parsing of LLM responses (optional, falls back to json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Faster Excel writer (optional, falls back to openpyxl)
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+
+# Concurrent LLM requests in flight by default; keep within the provider's rate limits
+DEFAULT_CONCURRENCY = 20
+
+# Model used for each provider (part of the response cache key)
+LLM_MODELS = {
+    "openai": "gpt-4o-mini",  # Using cost-effective model
+    "openrouter": "deepseek/deepseek-chat-v3-0324:free",
+    "anthropic": "claude-3-haiku-20240307",  # Using cost-effective model
+}
+
+# Retries for OpenRouter requests that hit a rate limit or a transient server error
+OPENROUTER_MAX_RETRIES = 3
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_BACKOFF_SECONDS = 0.5
+
+# Column types for the important contacts CSV: text read as-is, repeated labels as
+# categories and the count as int32, instead of letting read_csv infer each column
+CONTACT_DTYPES = {
+    'contact_name': str,
+    'email': str,
+    'domain': 'category',
+    'organization': str,
+    'organization_category': 'category',
+    'engagement_level': 'category',
+    'interaction_count': 'int32',
+}
+
+# Seconds between status checks while waiting for a batch to finish
+BATCH_POLL_SECONDS = 30
+
+# Providers with a batch API (OpenRouter only supports online requests)
+BATCH_PROVIDERS = ("openai", "anthropic")
+
+# Cached LLM analyses are reused for 30 days
+CACHE_EXPIRY_SECONDS = 30 * 86400
+
+# Instructions shared by every contact. They are sent as the system prompt so that
+# each request starts with the same prefix, which providers can cache; the
+# per-contact data goes in the user message.
+ANALYSIS_SYSTEM_PROMPT = """You are an expert at analyzing professional relationships and email communications. Always respond with valid JSON.
+
+You will be given a contact's details and email interactions with ALLFED. Please provide a structured analysis with the following information:
+
+1. RELATIONSHIP_TYPE: (Choose one: Government Official, Academic/Researcher, NGO Representative, Industry Contact, Media, Other)
+
+2. ENGAGEMENT_LEVEL: (Choose one: High - Regular collaboration/communication, Medium - Occasional meaningful contact, Low - Minimal/one-off contact)
+
+3. KEY_TOPICS: List 2-3 main topics of discussion based on email subjects and content
+
+4. RELATIONSHIP_DESCRIPTION: 2-3 sentence description of this person's role and relationship with ALLFED
+
+5. HANDOVER_PRIORITY: (Choose one: High - Critical relationship to maintain, Medium - Important but not urgent, Low - Optional to maintain)
+
+6. SUGGESTED_NEXT_STEPS: Brief suggestion for how successor should approach this relationship
+
+Please format your response as JSON with these exact keys:
+{
+    "relationship_type": "",
+    "engagement_level": "",
+    "key_topics": [],
+    "relationship_description": "",
+    "handover_priority": "",
+    "suggested_next_steps": ""
+}
+"""
+
+
+def retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying a request, honouring the server's Retry-After header"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return RETRY_BACKOFF_SECONDS * 2 ** attempt
+
+
+# JSON object inside a ```json code block, or else from the first '{' to the last '}'
+_JSON_BLOCK_RE = re.compile(r'```json\s*(\{.*?\})\s*```|(\{.*\})', re.DOTALL)
+
+
+def loads_json(text: str):
+    """Parse JSON text, with orjson when available"""
+    return orjson.loads(text) if ORJSON_AVAILABLE else json.loads(text)
+
+
+class LLMResponseCache:
+    """Persistent cache of parsed LLM analyses, keyed by a hash of provider, model and prompt"""
+    
+    def __init__(self, cache_file: Path, expiry_seconds: int = CACHE_EXPIRY_SECONDS):
+        self.expiry_seconds = expiry_seconds
+        self.conn = sqlite3.connect(cache_file)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, analysis TEXT NOT NULL, created REAL NOT NULL)"
+        )
+    
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{provider}|{model}|{prompt}".encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT analysis FROM analyses WHERE key = ? AND created > ?",
+            (key, time.time() - self.expiry_seconds)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def set(self, key: str, analysis: Dict) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO analyses (key, analysis, created) VALUES (?, ?, ?)",
+            (key, json.dumps(analysis), time.time())
+        )
+        self.conn.commit()
+    
+    def close(self) -> None:
+        self.conn.close()
+
 
 class ContactEnhancer:
-    def __init__(self, output_dir: str = "output", llm_provider: str = "openai"):
+    def __init__(self, output_dir: str = "output", llm_provider: str = "openai", use_cache: bool = True):
         self.output_dir = Path(output_dir)
         self.llm_provider = llm_provider
+        self.use_cache = use_cache
+        self.cache = None
+        
+        # Source of each prompt's email text; narrowed to the contacts file's columns in enhance_contacts
+        self.interaction_text = self.sample_context_text
         
         # Load environment variables
         load_dotenv()
         
-        # Initialize LLM client
+        # Initialize LLM client (async, so many contacts can be analyzed concurrently)
         self.client = None
+        self.http = None
         if llm_provider == "openai" and OPENAI_AVAILABLE:
             api_key = os.getenv("OPENAI_API_KEY")
             if api_key:
-                self.client = openai.OpenAI(api_key=api_key)
+                self.client = openai.AsyncOpenAI(api_key=api_key)
             else:
                 print("Warning: OPENAI_API_KEY not found in environment")
         
@@ -56,7 +202,7 @@ class ContactEnhancer:
         elif llm_provider == "anthropic" and ANTHROPIC_AVAILABLE:
             api_key = os.getenv("ANTHROPIC_API_KEY")
             if api_key:
-                self.client = anthropic.Anthropic(api_key=api_key)
+                self.client = anthropic.AsyncAnthropic(api_key=api_key)
             else:
                 print("Warning: ANTHROPIC_API_KEY not found in environment")
     
@@ -72,33 +218,48 @@ class ContactEnhancer:
             raise FileNotFoundError(f"Interactions file not found: {interactions_file}")
         
         # Load contacts
-        contacts_df = pd.read_csv(contacts_file)
+        contacts_df = pd.read_csv(contacts_file, dtype=CONTACT_DTYPES)
         
-        # Load interactions
-        with open(interactions_file, 'r') as f:
-            interactions = json.load(f)
+        # Load interactions, keeping only those of the contacts being enhanced
+        wanted = set(contacts_df['email'])
+        interactions = {email: interaction_list
+                        for email, interaction_list in iter_interactions(interactions_file)
+                        if email in wanted}
         
         return contacts_df, interactions
     
-    def create_contact_analysis_prompt(self, contact: Dict, interactions: List[Dict]) -> str:
-        """Create a prompt for analyzing a contact's relationship with ALLFED"""
-        
-        # Use the sample email context from our important contacts summary
+    def select_interaction_text_builder(self, contacts_df: pd.DataFrame) -> None:
+        """Choose how prompts get their email text, once for the whole contacts file"""
+        if 'sample_email_context' in contacts_df.columns:
+            self.interaction_text = self.sample_context_text
+        else:
+            self.interaction_text = self.interactions_text
+    
+    def sample_context_text(self, contact: Dict, interactions: List[Dict]) -> str:
+        """Use the sample email context from our important contacts summary"""
         interaction_text = contact.get('sample_email_context', 'No email context available')
         
         # If no sample context, fall back to building from interactions
         if not interaction_text or interaction_text == 'No email context available':
-            interaction_summaries = []
-            for interaction in interactions[:5]:  # Limit to first 5 interactions
-                interaction_summaries.append(
-                    f"Date: {interaction['date']}\n"
-                    f"Subject: {interaction['subject']}\n"
-                    f"Content: {interaction['body_snippet'][:200]}...\n"
-                )
-            interaction_text = "\n---\n".join(interaction_summaries)
+            return self.interactions_text(contact, interactions)
+        return interaction_text
+    
+    @staticmethod
+    def interactions_text(contact: Dict, interactions: List[Dict]) -> str:
+        """Build the email text from the contact's first interactions"""
+        return "\n---\n".join([
+            f"Date: {interaction['date']}\n"
+            f"Subject: {interaction['subject']}\n"
+            f"Content: {interaction['body_snippet'][:200]}...\n"
+            for interaction in interactions[:5]  # Limit to first 5 interactions
+        ])
+    
+    def create_contact_analysis_prompt(self, contact: Dict, interactions: List[Dict]) -> str:
+        """Create a prompt for analyzing a contact's relationship with ALLFED"""
+        interaction_text = self.interaction_text(contact, interactions)
         
         prompt = f"""
-Analyze this contact's relationship with ALLFED based on email interactions:
+Analyze this contact's relationship with ALLFED based on these email interactions:
 
 CONTACT INFORMATION:
 Name: {contact.get('contact_name', contact.get('name', 'Unknown'))}
@@ -116,76 +277,75 @@ Interaction Summary: {contact.get('interaction_summary', 'Unknown')}
 
 EMAIL INTERACTIONS:
 {interaction_text}
-
-Please provide a structured analysis with the following information:
-
-1. RELATIONSHIP_TYPE: (Choose one: Government Official, Academic/Researcher, NGO Representative, Industry Contact, Media, Other)
-
-2. ENGAGEMENT_LEVEL: (Choose one: High - Regular collaboration/communication, Medium - Occasional meaningful contact, Low - Minimal/one-off contact)
-
-3. KEY_TOPICS: List 2-3 main topics of discussion based on email subjects and content
-
-4. RELATIONSHIP_DESCRIPTION: 2-3 sentence description of this person's role and relationship with ALLFED
-
-5. HANDOVER_PRIORITY: (Choose one: High - Critical relationship to maintain, Medium - Important but not urgent, Low - Optional to maintain)
-
-6. SUGGESTED_NEXT_STEPS: Brief suggestion for how successor should approach this relationship
-
-Please format your response as JSON with these exact keys:
-{{
-    "relationship_type": "",
-    "engagement_level": "",
-    "key_topics": [],
-    "relationship_description": "",
-    "handover_priority": "",
-    "suggested_next_steps": ""
-}}
 """
         return prompt
     
-    def analyze_contact_with_llm(self, contact: Dict, interactions: List[Dict]) -> Optional[Dict]:
-        """Analyze a single contact using LLM"""
+    def cache_key(self, prompt: str) -> str:
+        """Response cache key for a contact prompt"""
+        return LLMResponseCache.make_key(self.llm_provider, LLM_MODELS[self.llm_provider],
+                                         ANALYSIS_SYSTEM_PROMPT + prompt)
+    
+    async def analyze_contact_with_llm(self, contact: Dict, interactions: List[Dict]) -> Optional[Dict]:
+        """Analyze a single contact using LLM, reusing a cached analysis of the same prompt"""
         if not self.client:
             return None
         
         prompt = self.create_contact_analysis_prompt(contact, interactions)
         
+        if self.cache is None:
+            return await self.request_analysis(contact, prompt)
+        
+        key = self.cache_key(prompt)
+        analysis = self.cache.get(key)
+        if analysis is None:
+            analysis = await self.request_analysis(contact, prompt)
+            if analysis is not None:
+                self.cache.set(key, analysis)
+        return analysis
+    
+    def build_request_params(self, prompt: str) -> Dict:
+        """Request parameters for one analysis, shared by online and batch requests"""
+        if self.llm_provider == "anthropic":
+            return {
+                "model": LLM_MODELS["anthropic"],
+                "max_tokens": 1000,
+                "temperature": 0.3,
+                # Mark the shared instructions as a cacheable prompt prefix
+                "system": [
+                    {"type": "text", "text": ANALYSIS_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+                ],
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ]
+            }
+        
+        # OpenAI and OpenRouter share the chat completions format
+        return {
+            "model": LLM_MODELS[self.llm_provider],
+            "messages": [
+                {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "max_tokens": 1000
+        }
+    
+    async def request_analysis(self, contact: Dict, prompt: str) -> Optional[Dict]:
+        """Send the analysis prompt to the LLM and parse its JSON response"""
+        params = self.build_request_params(prompt)
+        
         try:
             if self.llm_provider == "openai":
-                response = self.client.chat.completions.create(
-                    model="gpt-4o-mini",  # Using cost-effective model
-                    messages=[
-                        {"role": "system", "content": "You are an expert at analyzing professional relationships and email communications. Always respond with valid JSON."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=1000
-                )
+                response = await self.client.chat.completions.create(**params)
                 content = response.choices[0].message.content
                 
             elif self.llm_provider == "openrouter":
-                # Direct API call to OpenRouter
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://allfed.info"
-                }
-                
-                data = {
-                    "model": "deepseek/deepseek-chat-v3-0324:free",
-                    "messages": [
-                        {"role": "system", "content": "You are an expert at analyzing professional relationships and email communications. Always respond with valid JSON."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 1000
-                }
-                
-                response = requests.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers=headers,
-                    json=data
-                )
+                # Direct API call to OpenRouter, retrying rate limits and transient server errors
+                for attempt in range(OPENROUTER_MAX_RETRIES + 1):
+                    response = await self.http.post("https://openrouter.ai/api/v1/chat/completions", json=params)
+                    if response.status_code not in RETRY_STATUS_CODES or attempt == OPENROUTER_MAX_RETRIES:
+                        break
+                    await asyncio.sleep(retry_delay(response, attempt))
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -195,58 +355,184 @@ Please format your response as JSON with these exact keys:
                     return None
                 
             elif self.llm_provider == "anthropic":
-                response = self.client.messages.create(
-                    model="claude-3-haiku-20240307",  # Using cost-effective model
-                    max_tokens=1000,
-                    temperature=0.3,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
+                response = await self.client.messages.create(**params)
                 content = response.content[0].text
             
-            # Parse JSON response
-            try:
-                # First try direct parsing
-                analysis = json.loads(content.strip())
-                return analysis
-            except json.JSONDecodeError:
-                # Try to extract JSON from markdown code blocks
-                try:
-                    # Remove markdown code block markers
-                    if '```json' in content:
-                        # Extract content between ```json and ```
-                        start = content.find('```json') + 7
-                        end = content.find('```', start)
-                        if end != -1:
-                            json_content = content[start:end].strip()
-                        else:
-                            json_content = content[start:].strip()
-                    elif content.strip().startswith('```') and content.strip().endswith('```'):
-                        # Handle generic code blocks
-                        lines = content.strip().split('\n')
-                        json_content = '\n'.join(lines[1:-1])
-                    else:
-                        # Look for JSON block in the response
-                        json_start = content.find('{')
-                        json_end = content.rfind('}') + 1
-                        if json_start != -1 and json_end > json_start:
-                            json_content = content[json_start:json_end]
-                        else:
-                            raise ValueError("No JSON found")
-                    
-                    analysis = json.loads(json_content)
-                    return analysis
-                except Exception as e:
-                    print(f"Failed to parse JSON response for {contact['email']}: {e}")
-                    print(f"Raw response: {content[:500]}...")
-                    return None
+            return self.parse_analysis_response(contact, content)
                 
         except Exception as e:
             print(f"Error analyzing contact {contact['email']}: {e}")
             return None
     
-    def enhance_contacts(self, max_contacts: Optional[int] = None) -> None:
+    def parse_analysis_response(self, contact: Dict, content: str) -> Optional[Dict]:
+        """Parse the JSON analysis out of an LLM response"""
+        try:
+            # First try direct parsing
+            return loads_json(content.strip())
+        except json.JSONDecodeError:
+            pass
+        
+        # Otherwise extract the JSON object from a markdown code block or surrounding text
+        try:
+            match = _JSON_BLOCK_RE.search(content)
+            if not match:
+                raise ValueError("No JSON found")
+            return loads_json(match.group(1) or match.group(2))
+        except Exception as e:
+            print(f"Failed to parse JSON response for {contact['email']}: {e}")
+            print(f"Raw response: {content[:500]}...")
+            return None
+    
+    async def analyze_contacts(self, contacts: List[Dict], interactions: Dict,
+                               concurrency: int = DEFAULT_CONCURRENCY,
+                               on_result: Optional[Callable[[Dict, Optional[Dict]], None]] = None
+                               ) -> List[Optional[Dict]]:
+        """Analyze contacts concurrently, returning analyses in the same order as contacts
+        
+        on_result, if given, is called with each contact and its analysis as soon as it arrives.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def bounded(contact):
+            async with semaphore:
+                analysis = await self.analyze_contact_with_llm(contact, interactions.get(contact['email'], []))
+            if on_result:
+                on_result(contact, analysis)
+            return analysis
+        
+        # OpenRouter calls share one pooled, keep-alive HTTP client for the whole run
+        if self.llm_provider == "openrouter":
+            self.http = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "https://allfed.info"
+                },
+                timeout=60,
+                # The pool limits belong on the transport: a client ignores limits= when given one
+                transport=httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+                    retries=OPENROUTER_MAX_RETRIES  # Retries failed connects
+                )
+            )
+        try:
+            tasks = [asyncio.create_task(bounded(contact)) for contact in contacts]
+            return await tqdm.gather(*tasks, desc="Analyzing contacts")
+        finally:
+            if self.http is not None:
+                await self.http.aclose()
+                self.http = None
+    
+    async def analyze_contacts_batch(self, contacts: List[Dict], interactions: Dict,
+                                     on_result: Optional[Callable[[Dict, Optional[Dict]], None]] = None
+                                     ) -> List[Optional[Dict]]:
+        """Analyze contacts through the provider's batch API, returning analyses in the same order as contacts
+        
+        on_result, if given, is called with each contact and its analysis once it is known.
+        """
+        prompts = [self.create_contact_analysis_prompt(contact, interactions.get(contact['email'], []))
+                   for contact in contacts]
+        analyses: List[Optional[Dict]] = [None] * len(contacts)
+        
+        # Only contacts without a cached analysis go into the batch
+        pending = []
+        for i, prompt in enumerate(prompts):
+            if self.cache is not None:
+                analyses[i] = self.cache.get(self.cache_key(prompt))
+            if analyses[i] is None:
+                pending.append(i)
+            elif on_result:
+                on_result(contacts[i], analyses[i])
+        
+        if not pending:
+            print("All contacts already have cached analyses")
+            return analyses
+        
+        # Custom IDs index into contacts; emails contain characters batch IDs may not
+        requests_by_id = {f"contact-{i}": self.build_request_params(prompts[i]) for i in pending}
+        print(f"Submitting batch of {len(requests_by_id)} contacts to {self.llm_provider}...")
+        
+        if self.llm_provider == "openai":
+            contents = await self.run_openai_batch(requests_by_id)
+        else:
+            contents = await self.run_anthropic_batch(requests_by_id)
+        
+        for i in pending:
+            content = contents.get(f"contact-{i}")
+            if content is not None:
+                analyses[i] = self.parse_analysis_response(contacts[i], content)
+                if analyses[i] is not None and self.cache is not None:
+                    self.cache.set(self.cache_key(prompts[i]), analyses[i])
+            if on_result:
+                on_result(contacts[i], analyses[i])
+        
+        print(f"Batch returned {sum(1 for i in pending if analyses[i] is not None)}/{len(pending)} analyses")
+        return analyses
+    
+    async def run_openai_batch(self, requests_by_id: Dict[str, Dict]) -> Dict[str, str]:
+        """Run chat completion requests through the OpenAI Batch API, returning response text by custom ID"""
+        lines = [
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body})
+            for custom_id, body in requests_by_id.items()
+        ]
+        batch_file = await self.client.files.create(
+            file=("contact_analysis_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"Started OpenAI batch {batch.id}")
+        
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(BATCH_POLL_SECONDS)
+            batch = await self.client.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            progress = f" ({counts.completed}/{counts.total} completed)" if counts else ""
+            print(f"Batch {batch.id}: {batch.status}{progress}")
+        
+        if not batch.output_file_id:
+            print(f"OpenAI batch {batch.id} ended with status {batch.status} and no output")
+            return {}
+        
+        output = await self.client.files.content(batch.output_file_id)
+        contents = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get("response")
+            if response and response["status_code"] == 200:
+                contents[result["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+            else:
+                print(f"Batch request {result['custom_id']} failed: {result.get('error')}")
+        return contents
+    
+    async def run_anthropic_batch(self, requests_by_id: Dict[str, Dict]) -> Dict[str, str]:
+        """Run message requests through the Anthropic Message Batches API, returning response text by custom ID"""
+        batch = await self.client.messages.batches.create(
+            requests=[{"custom_id": custom_id, "params": params} for custom_id, params in requests_by_id.items()]
+        )
+        print(f"Started Anthropic batch {batch.id}")
+        
+        while batch.processing_status != "ended":
+            await asyncio.sleep(BATCH_POLL_SECONDS)
+            batch = await self.client.messages.batches.retrieve(batch.id)
+            print(f"Batch {batch.id}: {batch.processing_status} "
+                  f"({batch.request_counts.succeeded} succeeded, {batch.request_counts.processing} processing)")
+        
+        contents = {}
+        async for result in await self.client.messages.batches.results(batch.id):
+            if result.result.type == "succeeded":
+                contents[result.custom_id] = result.result.message.content[0].text
+            else:
+                print(f"Batch request {result.custom_id} {result.result.type}")
+        return contents
+    
+    def enhance_contacts(self, max_contacts: Optional[int] = None, concurrency: int = DEFAULT_CONCURRENCY,
+                         mode: str = "online") -> None:
         """Enhance contacts with LLM analysis"""
         print("Loading important contacts and interactions...")
         contacts_df, interactions = self.load_contacts_and_interactions()
@@ -261,41 +547,113 @@ Please format your response as JSON with these exact keys:
         
         print(f"Enhancing {len(contacts_df)} important contacts with LLM analysis...")
         
-        enhanced_contacts = []
+        # One plain dict per contact; these records become the enhanced rows
+        contacts = contacts_df.to_dict('records')
+        self.select_interaction_text_builder(contacts_df)
         
-        for _, contact in tqdm(contacts_df.iterrows(), total=len(contacts_df), desc="Analyzing contacts"):
-            contact_dict = contact.to_dict()
-            contact_interactions = interactions.get(contact['email'], [])
-            
-            # Get LLM analysis
-            analysis = self.analyze_contact_with_llm(contact_dict, contact_interactions)
-            
-            # Combine original contact data with analysis
-            enhanced_contact = contact_dict.copy()
-            if analysis:
-                enhanced_contact.update({
-                    'llm_relationship_type': analysis.get('relationship_type', ''),
-                    'llm_engagement_level': analysis.get('engagement_level', ''),
-                    'llm_key_topics': ', '.join(analysis.get('key_topics', [])),
-                    'llm_relationship_description': analysis.get('relationship_description', ''),
-                    'llm_handover_priority': analysis.get('handover_priority', ''),
-                    'llm_suggested_next_steps': analysis.get('suggested_next_steps', '')
-                })
-            else:
-                # Add empty fields if analysis failed
-                enhanced_contact.update({
-                    'llm_relationship_type': 'Analysis Failed',
-                    'llm_engagement_level': '',
-                    'llm_key_topics': '',
-                    'llm_relationship_description': '',
-                    'llm_handover_priority': '',
-                    'llm_suggested_next_steps': ''
-                })
-            
-            enhanced_contacts.append(enhanced_contact)
+        # Contacts enhanced by an earlier, interrupted run are read back from the checkpoint,
+        # unless they were analyzed with another provider or model or from different input
+        keys = {contact['email']: self.cache_key(self.create_contact_analysis_prompt(
+                    contact, interactions.get(contact['email'], [])))
+                for contact in contacts}
+        checkpoint_file = self.output_dir / "important_contacts_enhanced.jsonl"
+        done = self.load_checkpoint(checkpoint_file, keys)
+        pending = [contact for contact in contacts if contact['email'] not in done]
+        if done:
+            print(f"Resuming: {len(contacts) - len(pending)} contacts already enhanced in {checkpoint_file}")
+        
+        # Keep interactions only for the contacts still to be analyzed, releasing the rest
+        interactions = {contact['email']: interactions[contact['email']]
+                        for contact in pending if contact['email'] in interactions}
+        
+        # Get LLM analyses, with up to `concurrency` requests in flight at once;
+        # each successful analysis is appended to the checkpoint as soon as it arrives
+        if self.use_cache:
+            self.cache = LLMResponseCache(self.output_dir / ".llm_cache.sqlite")
+        try:
+            with open(checkpoint_file, 'a') as checkpoint:
+                def write_checkpoint(contact: Dict, analysis: Optional[Dict]) -> None:
+                    if analysis:
+                        self.add_analysis_fields(contact, analysis)
+                        checkpoint.write(json.dumps({
+                            'provider': self.llm_provider,
+                            'model': LLM_MODELS[self.llm_provider],
+                            'key': keys[contact['email']],
+                            'contact': contact
+                        }) + "\n")
+                        checkpoint.flush()
+                
+                if mode == "batch" and self.llm_provider in BATCH_PROVIDERS:
+                    analyses = asyncio.run(self.analyze_contacts_batch(pending, interactions, write_checkpoint))
+                else:
+                    if mode == "batch":
+                        print(f"Batch mode is not available for {self.llm_provider}; sending requests individually")
+                    analyses = asyncio.run(self.analyze_contacts(pending, interactions, concurrency, write_checkpoint))
+        finally:
+            if self.cache is not None:
+                self.cache.close()
+                self.cache = None
         
-        # Save enhanced contacts
-        self.save_enhanced_contacts(enhanced_contacts)
+        # Failed analyses are not checkpointed, so they are retried by the next run
+        for contact, analysis in zip(pending, analyses):
+            if not analysis:
+                self.add_analysis_fields(contact, None)
+        
+        # Save enhanced contacts in their original order; the checkpoint is no longer needed
+        self.save_enhanced_contacts([done.get(contact['email'], contact) for contact in contacts])
+        checkpoint_file.unlink()
+    
+    def load_checkpoint(self, checkpoint_file: Path, keys: Dict[str, str]) -> Dict[str, Dict]:
+        """Load enhanced contacts saved by an interrupted run, keyed by email
+        
+        keys maps each contact's email to the cache key of its current prompt; checkpointed
+        contacts made with another provider or model, or from a different prompt, are skipped.
+        """
+        if not checkpoint_file.exists():
+            return {}
+        
+        done = {}
+        stale = 0
+        with open(checkpoint_file, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partial last line from an interrupted write
+                contact = entry.get('contact')
+                if (contact is not None
+                        and entry.get('provider') == self.llm_provider
+                        and entry.get('model') == LLM_MODELS[self.llm_provider]
+                        and entry.get('key') == keys.get(contact['email'])):
+                    done[contact['email']] = contact
+                else:
+                    stale += 1
+        if stale:
+            print(f"Ignoring {stale} checkpointed contacts from a different provider, model or input")
+        return done
+    
+    @staticmethod
+    def add_analysis_fields(contact: Dict, analysis: Optional[Dict]) -> None:
+        """Add the LLM analysis fields to a contact's record"""
+        if analysis:
+            contact.update({
+                'llm_relationship_type': analysis.get('relationship_type', ''),
+                'llm_engagement_level': analysis.get('engagement_level', ''),
+                'llm_key_topics': ', '.join(analysis.get('key_topics', [])),
+                'llm_relationship_description': analysis.get('relationship_description', ''),
+                'llm_handover_priority': analysis.get('handover_priority', ''),
+                'llm_suggested_next_steps': analysis.get('suggested_next_steps', '')
+            })
+        else:
+            # Add empty fields if analysis failed
+            contact.update({
+                'llm_relationship_type': 'Analysis Failed',
+                'llm_engagement_level': '',
+                'llm_key_topics': '',
+                'llm_relationship_description': '',
+                'llm_handover_priority': '',
+                'llm_suggested_next_steps': ''
+            })
     
     def save_enhanced_contacts(self, enhanced_contacts: List[Dict]) -> None:
         """Save enhanced contact data"""
@@ -311,6 +669,11 @@ Please format your response as JSON with these exact keys:
         enhanced_df = enhanced_df.sort_values(['priority_score', 'engagement_score', 'interaction_count'], 
                                             ascending=[False, False, False])
         
+        # Split out the priority tiers once for the Excel sheets and the report
+        priority_groups = enhanced_df.groupby('llm_handover_priority', sort=False)
+        high_priority = priority_groups.get_group('High') if 'High' in priority_groups.groups else None
+        medium_priority = priority_groups.get_group('Medium') if 'Medium' in priority_groups.groups else None
+        
         # Save to CSV
         csv_file = self.output_dir / "important_contacts_enhanced.csv"
         enhanced_df.to_csv(csv_file, index=False)
@@ -318,27 +681,32 @@ Please format your response as JSON with these exact keys:
         
         # Save to Excel with formatting
         excel_file = self.output_dir / "important_contacts_enhanced.xlsx"
-        with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
+        excel_engine = 'xlsxwriter' if XLSXWRITER_AVAILABLE else 'openpyxl'
+        with pd.ExcelWriter(excel_file, engine=excel_engine) as writer:
             enhanced_df.to_excel(writer, sheet_name='Enhanced Contacts', index=False)
             
             # Create priority-based sheets
-            high_priority = enhanced_df[enhanced_df['llm_handover_priority'] == 'High']
-            if not high_priority.empty:
+            if high_priority is not None:
                 high_priority.to_excel(writer, sheet_name='High Priority', index=False)
             
-            medium_priority = enhanced_df[enhanced_df['llm_handover_priority'] == 'Medium']
-            if not medium_priority.empty:
+            if medium_priority is not None:
                 medium_priority.to_excel(writer, sheet_name='Medium Priority', index=False)
         
         print(f"Saved enhanced contacts to {excel_file}")
         
         # Generate summary report
-        self.generate_enhancement_report(enhanced_df)
+        self.generate_enhancement_report(enhanced_df, high_priority)
     
-    def generate_enhancement_report(self, enhanced_df: pd.DataFrame) -> None:
+    def generate_enhancement_report(self, enhanced_df: pd.DataFrame,
+                                    high_priority: Optional[pd.DataFrame] = None) -> None:
         """Generate a report on the enhanced contacts"""
         report_file = self.output_dir / "important_contacts_enhancement_report.txt"
         
+        # Callers that did not already split out the tiers get the High tier derived here
+        if high_priority is None:
+            high_mask = enhanced_df['llm_handover_priority'] == 'High'
+            high_priority = enhanced_df[high_mask] if high_mask.any() else None
+        
         with open(report_file, 'w') as f:
             f.write("ALLFED Contact Enhancement Report\n")
             f.write("=" * 50 + "\n\n")
@@ -349,30 +717,30 @@ Please format your response as JSON with these exact keys:
             f.write("HANDOVER PRIORITY BREAKDOWN\n")
             f.write("-" * 30 + "\n")
             priority_counts = enhanced_df['llm_handover_priority'].value_counts()
-            for priority, count in priority_counts.items():
-                f.write(f"{priority}: {count}\n")
+            f.write("".join(f"{priority}: {count}\n" for priority, count in priority_counts.items()))
             f.write("\n")
             
             # Relationship type breakdown
             f.write("RELATIONSHIP TYPE BREAKDOWN\n")
             f.write("-" * 30 + "\n")
             type_counts = enhanced_df['llm_relationship_type'].value_counts()
-            for rel_type, count in type_counts.items():
-                f.write(f"{rel_type}: {count}\n")
+            f.write("".join(f"{rel_type}: {count}\n" for rel_type, count in type_counts.items()))
             f.write("\n")
             
             # High priority contacts
-            high_priority = enhanced_df[enhanced_df['llm_handover_priority'] == 'High']
-            if not high_priority.empty:
+            if high_priority is not None:
                 f.write("HIGH PRIORITY CONTACTS FOR HANDOVER\n")
                 f.write("-" * 35 + "\n")
-                for _, contact in high_priority.iterrows():
-                    f.write(f"\n{contact.get('contact_name', contact.get('name', 'Unknown'))} <{contact['email']}>\n")
-                    f.write(f"Organization: {contact['organization']}\n")
-                    f.write(f"Relationship: {contact['llm_relationship_description']}\n")
-                    f.write(f"Key Topics: {contact['llm_key_topics']}\n")
-                    f.write(f"Next Steps: {contact['llm_suggested_next_steps']}\n")
-                    f.write("-" * 50 + "\n")
+                # Format every contact's block from plain records and write them in one call
+                f.write("".join(
+                    f"\n{contact.get('contact_name', contact.get('name', 'Unknown'))} <{contact['email']}>\n"
+                    f"Organization: {contact['organization']}\n"
+                    f"Relationship: {contact['llm_relationship_description']}\n"
+                    f"Key Topics: {contact['llm_key_topics']}\n"
+                    f"Next Steps: {contact['llm_suggested_next_steps']}\n"
+                    + "-" * 50 + "\n"
+                    for contact in high_priority.to_dict('records')
+                ))
         
         print(f"Generated enhancement report: {report_file}")
 
@@ -381,7 +749,12 @@ Please format your response as JSON with these exact keys:
 @click.option('--output', default='output', help='Output directory with contact data')
 @click.option('--provider', default='openai', type=click.Choice(['openai', 'anthropic', 'openrouter']), help='LLM provider')
 @click.option('--max-contacts', type=int, help='Maximum number of contacts to analyze (for testing)')
-def main(output: str, provider: str, max_contacts: Optional[int]):
+@click.option('--concurrency', default=DEFAULT_CONCURRENCY, type=click.IntRange(min=1),
+              help=f'Maximum concurrent LLM requests (default: {DEFAULT_CONCURRENCY})')
+@click.option('--no-cache', is_flag=True, help='Query the LLM for every contact, ignoring cached analyses')
+@click.option('--mode', default='online', type=click.Choice(['online', 'batch']),
+              help='Send requests individually (online) or through the provider batch API (batch; cheaper, can take hours)')
+def main(output: str, provider: str, max_contacts: Optional[int], concurrency: int, no_cache: bool, mode: str):
     """Enhance extracted contacts with LLM analysis"""
     
     # Check if required files exist
@@ -396,7 +769,7 @@ def main(output: str, provider: str, max_contacts: Optional[int]):
         return
     
     # Initialize enhancer
-    enhancer = ContactEnhancer(output, provider)
+    enhancer = ContactEnhancer(output, provider, use_cache=not no_cache)
     
     if not enhancer.client:
         click.echo(f"Error: Could not initialize {provider} client. Please check your API key.")
@@ -409,7 +782,7 @@ def main(output: str, provider: str, max_contacts: Optional[int]):
         return
     
     # Enhance contacts
-    enhancer.enhance_contacts(max_contacts)
+    enhancer.enhance_contacts(max_contacts, concurrency, mode)
     
     click.echo("\nContact enhancement complete!")
     click.echo(f"Check the '{output}' directory for enhanced results.")
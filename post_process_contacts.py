@@ -7,61 +7,55 @@ Removes:
 """
 
 import pandas as pd
-import json
+import re
 from pathlib import Path
 import click
-from typing import Set
+from typing import Iterable, List, Set, Tuple
 
-def load_interaction_data(interactions_file: str) -> dict:
-    """Load interaction data from JSON file"""
-    print("Loading interaction data...")
-    with open(interactions_file, 'r') as f:
-        interactions = json.load(f)
-    return interactions
+from contact_summary_common import iter_interactions
+
+# Internal collaborator subject, matched case-insensitively and with any whitespace between words
+RESEARCH_STRATEGY_RE = re.compile(r'research\s+strategy\s+session', re.IGNORECASE)
 
-def find_research_strategy_contacts(interactions: dict) -> Set[str]:
+def find_research_strategy_contacts(interactions: Iterable[Tuple[str, List[dict]]]) -> Set[str]:
     """Find contacts who have emails with 'Research Strategy Session' in subject"""
-    research_strategy_contacts = set()
-    
     print("Scanning for 'Research Strategy Session' subjects...")
-    for email, interaction_list in interactions.items():
-        for interaction in interaction_list:
-            subject = interaction.get('subject', '').lower()
-            if 'research strategy session' in subject:
-                research_strategy_contacts.add(email)
-                print(f"  Found internal collaborator: {email}")
-                break  # No need to check more interactions for this contact
+    # any() stops at the first matching subject for each contact
+    research_strategy_contacts = {
+        email for email, interaction_list in interactions
+        if any(RESEARCH_STRATEGY_RE.search(interaction.get('subject', ''))
+               for interaction in interaction_list)
+    }
     
     print(f"Found {len(research_strategy_contacts)} contacts with 'Research Strategy Session' subjects")
     return research_strategy_contacts
 
-def clean_contacts(input_file: str, output_file: str, interactions_file: str) -> None:
-    """Clean the contacts CSV by removing unwanted contacts"""
+def clean_contacts(input_file: str, output_file: str, interactions_file: str) -> pd.DataFrame:
+    """Clean the contacts CSV by removing unwanted contacts, returning the cleaned contacts"""
     
     # Load contacts
     print(f"Loading contacts from {input_file}...")
-    df = pd.read_csv(input_file)
+    # Only email and domain are filtered on; read them as text without type inference
+    df = pd.read_csv(input_file, dtype={'email': str, 'domain': str})
     initial_count = len(df)
     print(f"Initial contact count: {initial_count}")
     
-    # Load interactions to find Research Strategy Session contacts
-    interactions = load_interaction_data(interactions_file)
-    research_strategy_contacts = find_research_strategy_contacts(interactions)
+    # Stream interactions to find Research Strategy Session contacts
+    print("Loading interaction data...")
+    research_strategy_contacts = find_research_strategy_contacts(iter_interactions(interactions_file))
     
-    # Filter out Research Strategy Session contacts
+    # Build each filter's mask once and drop all matches in a single pass;
+    # each count excludes rows already removed by an earlier filter
     print("\nFiltering out Research Strategy Session contacts...")
-    before_research_filter = len(df)
-    df = df[~df['email'].isin(research_strategy_contacts)]
-    after_research_filter = len(df)
-    research_removed = before_research_filter - after_research_filter
+    keep_mask = ~df['email'].isin(research_strategy_contacts)
+    research_removed = initial_count - int(keep_mask.sum())
     print(f"Removed {research_removed} Research Strategy Session contacts")
     
     # Filter out docos.bounces.google.com domain
     print("\nFiltering out docos.bounces.google.com domain...")
-    before_bounce_filter = len(df)
-    df = df[df['domain'] != 'docos.bounces.google.com']
-    after_bounce_filter = len(df)
-    bounce_removed = before_bounce_filter - after_bounce_filter
+    bounce_mask = keep_mask & (df['domain'] == 'docos.bounces.google.com')
+    bounce_removed = int(bounce_mask.sum())
+    keep_mask &= ~bounce_mask
     print(f"Removed {bounce_removed} docos.bounces.google.com contacts")
     
     # Additional cleanup - remove other common bounce domains
@@ -72,12 +66,13 @@ def clean_contacts(input_file: str, output_file: str, interactions_file: str) ->
     ]
     
     print(f"\nFiltering out additional bounce domains: {bounce_domains}")
-    before_additional_filter = len(df)
-    df = df[~df['domain'].isin(bounce_domains)]
-    after_additional_filter = len(df)
-    additional_removed = before_additional_filter - after_additional_filter
+    additional_mask = keep_mask & df['domain'].isin(bounce_domains)
+    additional_removed = int(additional_mask.sum())
+    keep_mask &= ~additional_mask
     print(f"Removed {additional_removed} additional bounce domain contacts")
     
+    df = df[keep_mask]
+    
     # Save cleaned contacts
     df.to_csv(output_file, index=False)
     
@@ -107,11 +102,11 @@ def clean_contacts(input_file: str, output_file: str, interactions_file: str) ->
     domain_counts = df['domain'].value_counts().head(10)
     for domain, count in domain_counts.items():
         print(f"  {domain}: {count}")
+    
+    return df
 
-def create_cleaned_australian_gov_file(cleaned_contacts_file: str, output_dir: str) -> None:
+def create_cleaned_australian_gov_file(df: pd.DataFrame, output_dir: str) -> None:
     """Create a separate file for Australian government contacts from cleaned data"""
-    df = pd.read_csv(cleaned_contacts_file)
-    
     if 'is_australian_government' in df.columns:
         au_gov_df = df[df['is_australian_government'] == True]
         
@@ -144,10 +139,10 @@ def main(input_file: str, output_file: str, interactions_file: str, output_dir:
         return
     
     # Run cleaning
-    clean_contacts(input_file, output_file, interactions_file)
+    cleaned_df = clean_contacts(input_file, output_file, interactions_file)
     
     # Create Australian government specific file
-    create_cleaned_australian_gov_file(output_file, output_dir)
+    create_cleaned_australian_gov_file(cleaned_df, output_dir)
     
     click.echo(f"\nPost-processing complete!")
     click.echo(f"Main cleaned file: {output_file}")
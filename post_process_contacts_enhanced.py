@@ -7,153 +7,176 @@ Removes:
 """
 
 import pandas as pd
-import json
 from pathlib import Path
 import click
-from typing import Set
+from typing import Iterable, List, Set, Tuple
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
-def load_interaction_data(interactions_file: str) -> dict:
-    """Load interaction data from JSON file"""
-    print("Loading interaction data...")
-    with open(interactions_file, 'r') as f:
-        interactions = json.load(f)
-    return interactions
+from contact_summary_common import iter_interactions
+
+# Arrow-backed strings for column-wise regex matching (optional, falls back to object strings)
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Internal subject patterns to filter out
+INTERNAL_SUBJECTS = [
+    'research strategy session',
+    'inclusion & diversity survey 2023',
+    'allfed london team day', 
+    'transgender fireside chat',
+    'allfed okrs',
+    'kpis exchange',
+    "farrah's birthday"
+]
 
-def find_internal_collaborator_contacts(interactions: dict) -> Set[str]:
+# All internal subjects as one alternation, matched against lowercased subjects
+INTERNAL_RE = re.compile('|'.join(map(re.escape, INTERNAL_SUBJECTS)))
+
+def find_internal_collaborator_contacts(interactions: Iterable[Tuple[str, List[dict]]]) -> Set[str]:
     """Find contacts who have emails with internal ALLFED team subjects"""
-    internal_contacts = set()
-    
-    # Internal subject patterns to filter out
-    internal_subjects = [
-        'research strategy session',
-        'inclusion & diversity survey 2023',
-        'allfed london team day', 
-        'transgender fireside chat',
-        'allfed okrs',
-        'kpis exchange',
-        "farrah's birthday"
-    ]
+    found = []
     
     print("Scanning for internal ALLFED team subjects...")
-    for email, interaction_list in interactions.items():
+    for email, interaction_list in interactions:
         for interaction in interaction_list:
-            subject = interaction.get('subject', '').lower()
-            for internal_pattern in internal_subjects:
-                if internal_pattern in subject:
-                    internal_contacts.add(email)
-                    print(f"  Found internal collaborator: {email} (subject: {internal_pattern})")
-                    break  # No need to check more patterns for this interaction
-            if email in internal_contacts:
+            match = INTERNAL_RE.search(interaction.get('subject', '').lower())
+            if match:
+                found.append((email, match.group(0)))
                 break  # No need to check more interactions for this contact
     
-    print(f"Found {len(internal_contacts)} contacts with internal ALLFED team subjects")
-    return internal_contacts
+    print(f"Found {len(found)} contacts with internal ALLFED team subjects")
+    
+    # Show some examples
+    for email, subject in found[:20]:  # Show first 20
+        print(f"  Found internal collaborator: {email} (subject: {subject})")
+    if len(found) > 20:
+        print(f"  ... and {len(found) - 20} more")
+    
+    return {email for email, _ in found}
+
+# Substrings that indicate bounce/automated emails. Patterns already covered by
+# 'bounces', 'noreply' or 'notifications' (e.g. bounces+id@..., *.bounces.google.com,
+# account-security-noreply@, ...@chime-notifications) are not listed separately.
+BOUNCE_PATTERNS = [
+    'bounces',           # Generic bounce patterns
+    'noreply',           # No-reply addresses
+    'no-reply',          # Alternative no-reply format
+    'notifications',     # Notification emails
+    'mailer-daemon',     # Mail system responses
+    'postmaster',        # Mail admin
+    'do-not-reply',      # Alternative format
+    'donotreply',        # Alternative format
+    'auto-reply',        # Auto-response
+    'autoreply',         # Auto-response
+    'system@',           # System emails
+    'automated@',        # Automated systems
+    'alert@',            # Alert systems
+    'digest@',           # Digest emails
+    'newsletter@',       # Newsletters (automated)
+    'updates@',          # Update notifications
+    'tickets@',          # Ticket systems
+    'marketing@',        # Marketing automation
+    'promo@',            # Promotional emails
+    'campaigns@',        # Campaign emails
+    'surveys@',          # Survey systems
+    'feedback@',         # Feedback systems
+    'reports@',          # Report generation
+    'alerts@',           # Alert systems
+    'service@',          # Service notifications
+]
+
+# Special patterns for complex bounce emails (already regular expressions)
+COMPLEX_BOUNCE_PATTERNS = [
+    r'[a-z0-9]{30,}@bounce\.researchgatemail\.net',  # ResearchGate bounces
+    r'prvs=[^@\n]*@',          # Microsoft prvs patterns (same as prvs=.*@, without backtracking)
+]
+
+# Domains that are primarily bounce/notification services
+BOUNCE_DOMAINS = [
+    'em9672.mail.anthropic.com',  # Anthropic marketing
+    'em3917.conlog.com.au',       # Conference marketing
+    'sendfox.longgameproject.org', # Marketing automation
+    'accountprotection.microsoft.com',
+    'groupgreeting.com',
+    'trellobutler.com',
+]
+
+# All of the above as one alternation, matched against lowercased addresses
+BOUNCE_RE = re.compile('|'.join(
+    [re.escape(pattern) for pattern in BOUNCE_PATTERNS + BOUNCE_DOMAINS] + COMPLEX_BOUNCE_PATTERNS
+))
+
+# Cheap checks on the split address that imply a BOUNCE_RE match: a local part equal to an
+# 'xxx@' pattern, starting with a bare pattern (or 'prvs='), or a domain equal to a bounce domain
+_BOUNCE_LOCAL_PARTS = frozenset(pattern[:-1] for pattern in BOUNCE_PATTERNS if pattern.endswith('@'))
+_BOUNCE_LOCAL_PREFIXES = tuple(pattern for pattern in BOUNCE_PATTERNS if '@' not in pattern) + ('prvs=',)
+_BOUNCE_DOMAIN_SET = frozenset(BOUNCE_DOMAINS)
 
 def is_bounce_or_automated_email(email: str) -> bool:
     """Check if email address indicates it's a bounce or automated email"""
-    email_lower = email.lower()
-    
-    # Patterns that indicate bounce/automated emails
-    bounce_patterns = [
-        'bounces',           # Generic bounce patterns
-        'noreply',           # No-reply addresses
-        'no-reply',          # Alternative no-reply format
-        'notifications',     # Notification emails
-        'mailer-daemon',     # Mail system responses
-        'postmaster',        # Mail admin
-        'do-not-reply',      # Alternative format
-        'donotreply',        # Alternative format
-        'auto-reply',        # Auto-response
-        'autoreply',         # Auto-response
-        'system@',           # System emails
-        'automated@',        # Automated systems
-        'alert@',            # Alert systems
-        'digest@',           # Digest emails
-        'newsletter@',       # Newsletters (automated)
-        'updates@',          # Update notifications
-        'tickets@',          # Ticket systems
-        'marketing@',        # Marketing automation
-        'promo@',            # Promotional emails
-        'campaigns@',        # Campaign emails
-        'surveys@',          # Survey systems
-        'feedback@',         # Feedback systems
-        'reports@',          # Report generation
-        'alerts@',           # Alert systems
-        'service@',          # Service notifications
-        'account-security-noreply@',  # Microsoft patterns
-        'allfedprojects-noreply@',    # Trello patterns
-    ]
-    
-    # Special patterns for complex bounce emails
-    complex_patterns = [
-        r'bounces\+.*@',           # bounces+numbers@domain
-        r'msprvs\d+=.*bounces',    # Microsoft bounce patterns
-        r'\d{8}-\w{4}-\w{4}@.*bounces',  # ID-based bounces
-        r'[a-z0-9]{20,}@.*bounces',      # Long random strings
-        r'[a-z0-9\-]{30,}@chime-notifications',  # Google chime patterns
-        r'[a-z0-9\-]{30,}@.*\.bounces\.',        # Generic long bounce patterns
-        r'[a-z0-9]{30,}@bounce\.researchgatemail\.net',  # ResearchGate bounces
-        r'prvs=.*@',               # Microsoft prvs patterns
-    ]
-    
-    # Check simple patterns
-    for pattern in bounce_patterns:
-        if pattern in email_lower:
-            return True
-    
-    # Check complex regex patterns
-    for pattern in complex_patterns:
-        if re.search(pattern, email_lower):
-            return True
-    
-    # Check for domains that are primarily bounce/notification services
-    bounce_domains = [
-        '.bounces.google.com',
-        '.bounces.',
-        'em9672.mail.anthropic.com',  # Anthropic marketing
-        'em3917.conlog.com.au',       # Conference marketing
-        'sendfox.longgameproject.org', # Marketing automation
-        'bounces.gov1.qemailserver.com',
-        'accountprotection.microsoft.com',
-        'groupgreeting.com',
-        'trellobutler.com',
-    ]
-    
-    for domain_pattern in bounce_domains:
-        if domain_pattern in email_lower:
-            return True
-    
-    return False
-
-def clean_contacts(input_file: str, output_file: str, interactions_file: str) -> None:
-    """Clean the contacts CSV by removing unwanted contacts"""
+    return _is_bounce_or_automated_lower(email.lower())
+
+@lru_cache(maxsize=65536)
+def _is_bounce_or_automated_lower(email_lower: str) -> bool:
+    """Bounce check on a lowercased address (cached, since callers often repeat addresses)"""
+    # Most automated senders are recognisable from the local part or domain alone
+    local, at, domain = email_lower.partition('@')
+    if at and (local in _BOUNCE_LOCAL_PARTS or local.startswith(_BOUNCE_LOCAL_PREFIXES)
+               or domain in _BOUNCE_DOMAIN_SET):
+        return True
+    
+    return BOUNCE_RE.search(email_lower) is not None
+
+def bounce_email_mask(emails: pd.Series, workers: int = 1) -> pd.Series:
+    """Boolean mask of bounce/automated addresses, split across worker processes if workers > 1"""
+    if workers <= 1 or len(emails) < workers:
+        return _bounce_email_mask(emails)
+    
+    chunk_size = -(-len(emails) // workers)
+    chunks = [emails.iloc[start:start + chunk_size] for start in range(0, len(emails), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return pd.concat(pool.map(_bounce_email_mask, chunks))
+
+def _bounce_email_mask(emails: pd.Series) -> pd.Series:
+    """Match BOUNCE_RE against a column of addresses; with pyarrow the lowercasing and
+    regex run in Arrow's string kernels (which take the pattern text)"""
+    if PYARROW_AVAILABLE:
+        emails = emails.astype('string[pyarrow]')
+    return emails.str.lower().str.contains(BOUNCE_RE.pattern, na=False).astype(bool)
+
+def clean_contacts(input_file: str, output_file: str, interactions_file: str, workers: int = 1,
+                   verbose: bool = False) -> pd.DataFrame:
+    """Clean the contacts CSV by removing unwanted contacts, returning the cleaned contacts"""
     
     # Load contacts
     print(f"Loading contacts from {input_file}...")
-    df = pd.read_csv(input_file)
+    # Only email and domain are matched on; read them as text without type inference
+    df = pd.read_csv(input_file, dtype={'email': str, 'domain': str})
     initial_count = len(df)
     print(f"Initial contact count: {initial_count}")
     
-    # Load interactions to find internal ALLFED team contacts
-    interactions = load_interaction_data(interactions_file)
-    internal_contacts = find_internal_collaborator_contacts(interactions)
+    # Stream interactions to find internal ALLFED team contacts
+    print("Loading interaction data...")
+    internal_contacts = find_internal_collaborator_contacts(iter_interactions(interactions_file))
     
-    # Filter out internal ALLFED team contacts
+    # Build both filters' masks and drop all matches in a single pass; the bounce
+    # count excludes contacts already removed as internal team members
     print("\nFiltering out internal ALLFED team contacts...")
-    before_internal_filter = len(df)
-    df = df[~df['email'].isin(internal_contacts)]
-    after_internal_filter = len(df)
-    internal_removed = before_internal_filter - after_internal_filter
+    internal_mask = df['email'].isin(internal_contacts)
+    internal_removed = int(internal_mask.sum())
     print(f"Removed {internal_removed} internal ALLFED team contacts")
     
     # Filter out bounce/automated emails
     print("\nFiltering out bounce and automated email addresses...")
-    before_bounce_filter = len(df)
     
-    # Create a mask for bounce emails
-    bounce_mask = df['email'].apply(is_bounce_or_automated_email)
-    bounce_emails = df[bounce_mask]['email'].tolist()
+    # Create a mask for bounce emails, matching the whole column at once
+    bounce_mask = bounce_email_mask(df['email'], workers) & ~internal_mask
+    bounce_emails = df.loc[bounce_mask, 'email'].tolist()
     
     # Show some examples
     if bounce_emails:
@@ -163,10 +186,9 @@ def clean_contacts(input_file: str, output_file: str, interactions_file: str) ->
         if len(bounce_emails) > 10:
             print(f"  ... and {len(bounce_emails) - 10} more")
     
-    # Apply the filter
-    df = df[~bounce_mask]
-    after_bounce_filter = len(df)
-    bounce_removed = before_bounce_filter - after_bounce_filter
+    # Apply both filters
+    df = df[~(internal_mask | bounce_mask)]
+    bounce_removed = len(bounce_emails)
     print(f"Removed {bounce_removed} bounce/automated email contacts")
     
     # Save cleaned contacts
@@ -192,16 +214,16 @@ def clean_contacts(input_file: str, output_file: str, interactions_file: str) ->
         au_gov_count = len(df[df['is_australian_government'] == True])
         print(f"Australian government contacts retained: {au_gov_count:,}")
     
-    # Show top domains after cleaning
-    print(f"\nTop 15 domains after enhanced cleaning:")
-    domain_counts = df['domain'].value_counts().head(15)
-    for domain, count in domain_counts.items():
-        print(f"  {domain}: {count}")
+    # Show top domains after cleaning (diagnostic; counting domains is a full pass over the column)
+    if verbose:
+        print(f"\nTop 15 domains after enhanced cleaning:")
+        domain_counts = df['domain'].value_counts().head(15)
+        print("\n".join(f"  {domain}: {count}" for domain, count in domain_counts.items()))
+    
+    return df
 
-def create_cleaned_australian_gov_file(cleaned_contacts_file: str, output_dir: str) -> None:
+def create_cleaned_australian_gov_file(df: pd.DataFrame, output_dir: str) -> None:
     """Create a separate file for Australian government contacts from cleaned data"""
-    df = pd.read_csv(cleaned_contacts_file)
-    
     if 'is_australian_government' in df.columns:
         au_gov_df = df[df['is_australian_government'] == True]
         
@@ -221,7 +243,9 @@ def create_cleaned_australian_gov_file(cleaned_contacts_file: str, output_dir: s
 @click.option('--output-file', default='output/contacts_all_cleaned.csv', help='Output cleaned contacts CSV file')
 @click.option('--interactions-file', default='output/contact_interactions.json', help='Interactions JSON file')
 @click.option('--output-dir', default='output', help='Output directory')
-def main(input_file: str, output_file: str, interactions_file: str, output_dir: str):
+@click.option('--workers', default=1, type=int, help='Worker processes for matching bounce addresses (default: 1)')
+@click.option('--verbose', is_flag=True, help='Also print the top domains after cleaning')
+def main(input_file: str, output_file: str, interactions_file: str, output_dir: str, workers: int, verbose: bool):
     """Enhanced cleaning: removes internal ALLFED team members and all bounce/automated emails"""
     
     # Check if files exist
@@ -234,10 +258,10 @@ def main(input_file: str, output_file: str, interactions_file: str, output_dir:
         return
     
     # Run cleaning
-    clean_contacts(input_file, output_file, interactions_file)
+    cleaned_df = clean_contacts(input_file, output_file, interactions_file, workers, verbose)
     
     # Create Australian government specific file
-    create_cleaned_australian_gov_file(output_file, output_dir)
+    create_cleaned_australian_gov_file(cleaned_df, output_dir)
     
     click.echo(f"\nEnhanced post-processing complete!")
     click.echo(f"Main cleaned file: {output_file}")
@@ -6,6 +6,7 @@ Creates a small sample MBOX for testing
 
 import mailbox
 import email
+import tempfile
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from pathlib import Path
@@ -103,6 +104,56 @@ ALLFED Research Team
     
     return mbox_path
 
+# Sample MBOX with a quoted '>From ' body line and a last message without a trailing newline
+SPLIT_TEST_MBOX = (
+    b"From sender@allfed.info Mon Jan  1 10:00:00 2024\n"
+    b"From: your.name@allfed.info\n"
+    b"To: john.smith@treasury.gov.au\n"
+    b"Subject: First message\n"
+    b"\n"
+    b"Hello John,\n"
+    b">From the notes of our last meeting:\n"
+    b"more text\n"
+    b"\n"
+    b"From sender@allfed.info Wed Feb 15 14:30:00 2024\n"
+    b"From: your.name@allfed.info\n"
+    b"To: prof.wilson@anu.edu.au\n"
+    b"Subject: Second message\n"
+    b"\n"
+    b"\n"
+    b"\n"
+    b"From sender@allfed.info Fri Mar 20 09:15:00 2024\n"
+    b"From: your.name@allfed.info\n"
+    b"To: researcher@csiro.au\n"
+    b"Subject: Last message\n"
+    b"\n"
+    b"No newline at the end"
+)
+
+def test_iter_mbox_messages_matches_mailbox():
+    """The streaming MBOX splitter yields the same messages as mailbox.mbox"""
+    from email_contact_extractor import EmailContactExtractor
+    
+    for name, content in [("LF", SPLIT_TEST_MBOX),
+                          ("CRLF", SPLIT_TEST_MBOX.replace(b"\n", b"\r\n"))]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mbox_path = Path(tmp_dir) / "split_test.mbox"
+            mbox_path.write_bytes(content)
+            
+            extractor = EmailContactExtractor(str(mbox_path), str(Path(tmp_dir) / "output"))
+            streamed = list(extractor.iter_mbox_messages())
+            
+            mbox = mailbox.mbox(str(mbox_path), create=False)
+            expected = [mbox.get_bytes(key) for key in mbox.keys()]
+            mbox.close()
+            
+            assert len(expected) == 3, name
+            assert [raw for raw, _ in streamed] == expected, name
+            # The bytes read add up to the whole file, so progress reaches 100%
+            assert sum(size for _, size in streamed) == len(content), name
+    
+    print("MBOX splitter matches mailbox.mbox")
+
 def test_extraction():
     """Test the email extraction system"""
     print("Creating sample MBOX file...")
@@ -137,6 +188,7 @@ def test_extraction():
     return True
 
 if __name__ == "__main__":
+    test_iter_mbox_messages_matches_mailbox()
     if test_extraction():
         print("\nEmail extraction system is working correctly!")
         print("You can now process your real MBOX file using:")
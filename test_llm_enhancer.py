@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Tests for the LLM contact enhancer
+Uses a fake LLM, so no API keys or network access are needed
+"""
+
+import asyncio
+import csv
+import json
+import tempfile
+import time
+from pathlib import Path
+import sys
+
+from llm_enhancer import CACHE_EXPIRY_SECONDS, ContactEnhancer, LLMResponseCache
+
+CONTACT_FIELDS = ['contact_name', 'email', 'domain', 'organization',
+                  'organization_category', 'engagement_level', 'interaction_count']
+
+SAMPLE_ANALYSIS = {
+    "relationship_type": "Academic/Researcher",
+    "engagement_level": "Medium",
+    "key_topics": ["food security"],
+    "relationship_description": "Research collaborator.",
+    "handover_priority": "Medium",
+    "suggested_next_steps": "Send an introduction email."
+}
+
+
+class Interrupted(Exception):
+    """Raised by the fake LLM to simulate a run stopped part-way through"""
+
+
+def write_contacts(output_dir, count, organization='ANU'):
+    """Write an important contacts CSV and matching interactions JSON with `count` contacts"""
+    emails = [f"person{i}@anu.edu.au" for i in range(count)]
+    with open(Path(output_dir) / "important_contacts_llm_summary.csv", 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CONTACT_FIELDS)
+        writer.writeheader()
+        for i, email in enumerate(emails):
+            writer.writerow({
+                'contact_name': f"Person {i}",
+                'email': email,
+                'domain': 'anu.edu.au',
+                'organization': organization,
+                'organization_category': 'Academic',
+                'engagement_level': 'Medium',
+                'interaction_count': count - i,
+            })
+
+    interactions = {email: [{
+        'date': '2024-01-01T10:00:00',
+        'subject': 'Research collaboration',
+        'body_snippet': f"Hello from {email}",
+    }] for email in emails}
+    with open(Path(output_dir) / "contact_interactions.json", 'w') as f:
+        json.dump(interactions, f)
+    return emails
+
+
+def fake_enhancer(output_dir, provider='openai', fail_after=None, use_cache=False):
+    """Create an enhancer whose LLM records the contacts it is asked about
+
+    With fail_after set, the fake LLM raises Interrupted once that many contacts have been analyzed.
+    """
+    enhancer = ContactEnhancer(output_dir, provider, use_cache=use_cache)
+    enhancer.client = "fake_client"
+    enhancer.requested = []
+    enhancer.interrupted = False
+
+    async def request_analysis(contact, prompt):
+        if fail_after is not None and len(enhancer.requested) >= fail_after:
+            if enhancer.interrupted:
+                await asyncio.sleep(3600)  # Cancelled when the interrupted run shuts down
+            enhancer.interrupted = True
+            raise Interrupted()
+        enhancer.requested.append(contact['email'])
+        return dict(SAMPLE_ANALYSIS)
+
+    enhancer.request_analysis = request_analysis
+    return enhancer
+
+
+def interrupt_run(output_dir, analyzed, provider='openai'):
+    """Run the enhancer until the fake LLM stops it after `analyzed` contacts"""
+    enhancer = fake_enhancer(output_dir, provider, fail_after=analyzed)
+    try:
+        enhancer.enhance_contacts(concurrency=1)
+    except Interrupted:
+        pass
+    else:
+        raise AssertionError("Run was expected to be interrupted")
+    assert (Path(output_dir) / "important_contacts_enhanced.jsonl").exists()
+    return enhancer.requested
+
+
+def test_resume_requests_only_remaining_contacts():
+    """A rerun after an interruption only sends the contacts that were not yet enhanced"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        emails = write_contacts(output_dir, 5)
+        first = interrupt_run(output_dir, 2)
+        assert len(first) == 2
+
+        enhancer = fake_enhancer(output_dir)
+        enhancer.enhance_contacts(concurrency=1)
+        assert sorted(enhancer.requested) == sorted(set(emails) - set(first))
+
+        # Every contact ends up in the output and the checkpoint is removed
+        with open(Path(output_dir) / "important_contacts_enhanced.csv", newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert sorted(row['email'] for row in rows) == sorted(emails)
+        assert all(row['llm_relationship_type'] == 'Academic/Researcher' for row in rows)
+        assert not (Path(output_dir) / "important_contacts_enhanced.jsonl").exists()
+
+
+def test_resume_ignores_checkpoint_from_other_provider():
+    """Contacts checkpointed with another provider are analyzed again"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        emails = write_contacts(output_dir, 4)
+        interrupt_run(output_dir, 2, provider='anthropic')
+
+        enhancer = fake_enhancer(output_dir, provider='openai')
+        enhancer.enhance_contacts(concurrency=1)
+        assert sorted(enhancer.requested) == sorted(emails)
+
+
+def test_resume_ignores_checkpoint_from_changed_input():
+    """Contacts checkpointed before the contacts CSV was regenerated are analyzed again"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        write_contacts(output_dir, 4)
+        interrupt_run(output_dir, 2)
+
+        emails = write_contacts(output_dir, 4, organization='Australian National University')
+        enhancer = fake_enhancer(output_dir)
+        enhancer.enhance_contacts(concurrency=1)
+        assert sorted(enhancer.requested) == sorted(emails)
+
+
+def test_cache_key_depends_on_provider_model_and_prompt():
+    """Cache keys are stable for the same request and differ if any part changes"""
+    key = LLMResponseCache.make_key("openai", "gpt-4o-mini", "prompt")
+    assert key == LLMResponseCache.make_key("openai", "gpt-4o-mini", "prompt")
+    assert len({
+        key,
+        LLMResponseCache.make_key("anthropic", "gpt-4o-mini", "prompt"),
+        LLMResponseCache.make_key("openai", "gpt-4o", "prompt"),
+        LLMResponseCache.make_key("openai", "gpt-4o-mini", "other prompt"),
+    }) == 4
+
+
+def test_cache_returns_stored_analysis_until_expiry():
+    """Analyses are returned by key until they are older than the expiry"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        cache = LLMResponseCache(Path(output_dir) / "cache.sqlite")
+        key = LLMResponseCache.make_key("openai", "gpt-4o-mini", "prompt")
+        other_key = LLMResponseCache.make_key("openai", "gpt-4o-mini", "other prompt")
+        cache.set(key, SAMPLE_ANALYSIS)
+        assert cache.get(key) == SAMPLE_ANALYSIS
+        assert cache.get(other_key) is None
+
+        # Age the entry to just past the 30-day expiry
+        cache.conn.execute("UPDATE analyses SET created = ?", (time.time() - CACHE_EXPIRY_SECONDS - 1,))
+        assert cache.get(key) is None
+        cache.close()
+
+
+def test_cache_persists_between_runs():
+    """A second run is answered from the cache without querying the LLM"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        emails = write_contacts(output_dir, 3)
+        enhancer = fake_enhancer(output_dir, use_cache=True)
+        enhancer.enhance_contacts(concurrency=1)
+        assert sorted(enhancer.requested) == sorted(emails)
+
+        enhancer = fake_enhancer(output_dir, use_cache=True)
+        enhancer.enhance_contacts(concurrency=1)
+        assert enhancer.requested == []
+
+
+def test_no_cache_queries_every_contact():
+    """With the cache disabled (--no-cache), cached analyses are ignored"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        emails = write_contacts(output_dir, 3)
+        fake_enhancer(output_dir, use_cache=True).enhance_contacts(concurrency=1)
+
+        enhancer = fake_enhancer(output_dir, use_cache=False)
+        enhancer.enhance_contacts(concurrency=1)
+        assert sorted(enhancer.requested) == sorted(emails)
+
+
+if __name__ == "__main__":
+    tests = [test_resume_requests_only_remaining_contacts,
+             test_resume_ignores_checkpoint_from_other_provider,
+             test_resume_ignores_checkpoint_from_changed_input,
+             test_cache_key_depends_on_provider_model_and_prompt,
+             test_cache_returns_stored_analysis_until_expiry,
+             test_cache_persists_between_runs,
+             test_no_cache_queries_every_contact]
+    for test in tests:
+        test()
+        print(f"{test.__name__}: passed")
+    print("\nAll LLM enhancer tests passed!")
+    sys.exit(0)